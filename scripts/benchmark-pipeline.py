@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of the face swap pipeline.
+Usage:
+    python scripts/benchmark-pipeline.py --stub --json benchmark.json
+    python scripts/benchmark-pipeline.py --source headshot.webp --image-sizes 1024 4032
+
+Times every stage of a /swap request (upload read, decode, detection,
+recognition, alignment, swapper inference, paste-back, encoding, base64 and
+response serialization) across source image sizes, source face counts and
+gallery sizes, and writes the medians and p95s as JSON. A stage's time is
+summed over its calls in a request; destinations are finished in parallel,
+so paste-back and encode can add up to more than the request total.
+
+--stub replaces the detector, recognizer and inswapper with tiny stand-ins
+so the suite runs in CI without the real ONNX weights; stage timings of the
+image handling stages stay representative, model stages do not.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import onnxruntime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import UploadFile  # noqa: E402
+
+from src.swaparoony.core.config import settings  # noqa: E402
+from src.swaparoony.models.schemas import FaceSwapResponse, SwappedImage  # noqa: E402
+from src.swaparoony.services.face_swap_service import FaceSwapService  # noqa: E402
+from src.swaparoony.utils.image_utils import validate_image_file  # noqa: E402
+from src.swaparoony.utils.timing import StageRecorder, stage  # noqa: E402
+
+# ArcFace reference landmarks for a 112x112 crop
+ARCFACE_KPS = np.array(
+    [[38.3, 51.7], [73.5, 51.5], [56.0, 71.7], [41.5, 92.4], [70.7, 92.2]],
+    dtype=np.float32,
+)
+
+
+class StubDetector:
+    """Returns ``face_count`` evenly spaced faces for any image"""
+
+    taskname = "detection"
+
+    def __init__(self, face_count: int = 1):
+        self.face_count = face_count
+
+    def detect(self, image, max_num=0, metric="default"):
+        height, width = image.shape[:2]
+        size = min(height * 0.6, width / (self.face_count + 1))
+        bboxes, kpss = [], []
+        for i in range(self.face_count):
+            x = (i + 0.5) * width / self.face_count - size / 2
+            y = (height - size) / 2
+            bboxes.append([x, y, x + size, y + size, 0.9])
+            kpss.append(ARCFACE_KPS / 112.0 * size + np.array([x, y]))
+        return (
+            np.array(bboxes, dtype=np.float32).reshape(-1, 5),
+            np.array(kpss, dtype=np.float32).reshape(-1, 5, 2),
+        )
+
+
+class StubRecognizer:
+    """Aligns the face crop like ArcFace and returns a random embedding"""
+
+    taskname = "recognition"
+    input_size = (112, 112)
+
+    def __init__(self):
+        self.rng = np.random.default_rng(0)
+
+    def get(self, image, face):
+        from insightface.utils import face_align
+
+        face_align.norm_crop(image, landmark=face.kps, image_size=112)
+        return self.rng.normal(size=512).astype(np.float32)
+
+
+def build_stub_swapper(path: Path):
+    """Tiny ONNX model with the inswapper_128 input/output layout"""
+    import onnx
+    from insightface.model_zoo.inswapper import INSwapper
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    initializers = [
+        numpy_helper.from_array(rng.normal(size=(512, 1)).astype(np.float32), "w"),
+        numpy_helper.from_array(np.array([-1, 1, 1, 1], dtype=np.int64), "shape"),
+        # INSwapper reads the embedding map from the last initializer
+        numpy_helper.from_array(rng.normal(size=(512, 512)).astype(np.float32), "emap"),
+    ]
+    nodes = [
+        helper.make_node("MatMul", ["source", "w"], ["proj"]),
+        helper.make_node("Reshape", ["proj", "shape"], ["bias"]),
+        helper.make_node("Add", ["target", "bias"], ["shifted"]),
+        helper.make_node("Sigmoid", ["shifted"], ["output"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "stub_inswapper",
+        [
+            helper.make_tensor_value_info("target", TensorProto.FLOAT, ["N", 3, 128, 128]),
+            helper.make_tensor_value_info("source", TensorProto.FLOAT, ["N", 512]),
+        ],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["N", 3, 128, 128])],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return INSwapper(model_file=str(path))
+
+
+def synthetic_image(size: int, seed: int) -> np.ndarray:
+    """Photo-like (smooth, noisy) 4:3 image with a long edge of ``size``"""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (max(3, size * 3 // 400), max(4, size // 100), 3))
+    image = cv2.resize(small.astype(np.uint8), (size, size * 3 // 4), cv2.INTER_CUBIC)
+    noise = rng.normal(0, 6, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def resize_long_edge(image: np.ndarray, size: int) -> np.ndarray:
+    scale = size / max(image.shape[:2])
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def configure_settings():
+    # Every request must run the full pipeline
+    settings.source_cache_bytes = 0
+    settings.result_cache_bytes = 0
+    settings.destination_cache_enabled = False
+    settings.max_file_size = 1 << 30
+
+
+def stub_service(workdir: Path) -> FaceSwapService:
+    service = FaceSwapService()
+    detector = StubDetector()
+    service.app = SimpleNamespace(
+        det_model=detector,
+        models={"detection": detector, "recognition": StubRecognizer()},
+    )
+    service.swapper = build_stub_swapper(workdir / "stub_inswapper.onnx")
+    service._initialized = True
+    return service
+
+
+def set_gallery(service: FaceSwapService, gallery: list, gallery_size: int):
+    """Use ``gallery_size`` destinations, cycling through the given images"""
+    images = [
+        (gallery[i % len(gallery)], f"destination{i}.jpg") for i in range(gallery_size)
+    ]
+    service.destination_images = images
+    service.destination_faces = {name: service._get_faces(image) for image, name in images}
+
+
+async def read_upload(data: bytes) -> bytes:
+    upload = UploadFile(io.BytesIO(data), filename="source.jpg")
+    with stage("upload_read"):
+        return await validate_image_file(upload)
+
+
+def run_request(service: FaceSwapService, data: bytes):
+    image_data = asyncio.run(read_upload(data))
+    results, faces_detected = service.process_face_swap_request(image_data, 1, 1)
+    with stage("serialization"):
+        FaceSwapResponse(
+            success=True,
+            message=f"Successfully swapped face onto {len(results)} images",
+            swapped_images=[
+                SwappedImage(image_data=b64, destination_name=name)
+                for b64, name in results
+            ],
+            faces_detected_in_source=faces_detected,
+        ).model_dump_json()
+    return faces_detected
+
+
+def summarize(values_ms: list) -> dict:
+    ordered = sorted(values_ms)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def benchmark_case(service: FaceSwapService, data: bytes, runs: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        run_request(service, data)
+
+    per_stage = {}
+    calls = {}
+    totals = []
+    faces_detected = 0
+    for _ in range(runs):
+        with StageRecorder() as recorder:
+            start = time.perf_counter()
+            faces_detected = run_request(service, data)
+            totals.append((time.perf_counter() - start) * 1000)
+        for name, durations in recorder.durations.items():
+            per_stage.setdefault(name, []).append(sum(durations) * 1000)
+            calls[name] = len(durations)
+
+    return {
+        "faces_detected": faces_detected,
+        "total": summarize(totals),
+        "stages": {
+            name: {**summarize(values), "calls_per_request": calls[name]}
+            for name, values in sorted(per_stage.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--stub", action="store_true", help="Use stub models")
+    parser.add_argument("--source", help="Source photo (real mode; default synthetic)")
+    parser.add_argument("--image-sizes", type=int, nargs="+", default=[640, 1280, 4032])
+    parser.add_argument(
+        "--face-counts",
+        type=int,
+        nargs="+",
+        default=[1, 4],
+        help="Faces in the source image (stub mode only)",
+    )
+    parser.add_argument("--gallery-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    configure_settings()
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.stub:
+            service = stub_service(Path(workdir))
+            gallery = [synthetic_image(1024, seed) for seed in range(4)]
+            face_counts = args.face_counts
+        else:
+            service = FaceSwapService()
+            service.initialize_models()
+            gallery = [image for image, _ in service.destination_images]
+            face_counts = [None]
+
+        source = cv2.imread(args.source) if args.source else synthetic_image(4032, 100)
+        cases = []
+        for gallery_size in args.gallery_sizes:
+            if args.stub:
+                service.app.det_model.face_count = 1
+            set_gallery(service, gallery, gallery_size)
+            for image_size in args.image_sizes:
+                data = cv2.imencode(".jpg", resize_long_edge(source, image_size))[1]
+                for face_count in face_counts:
+                    if face_count is not None:
+                        service.app.det_model.face_count = face_count
+                    result = benchmark_case(service, data.tobytes(), args.runs, args.warmup)
+                    cases.append(
+                        {
+                            "image_size": image_size,
+                            "upload_bytes": int(data.size),
+                            "source_faces": face_count,
+                            "gallery_size": gallery_size,
+                            **result,
+                        }
+                    )
+                    print(
+                        f"size={image_size:<5} faces={result['faces_detected']:<2} "
+                        f"gallery={gallery_size:<2} total={result['total']['median_ms']:.1f} ms"
+                    )
+        service.shutdown()
+
+    report = {
+        "mode": "stub" if args.stub else "real",
+        "runs": args.runs,
+        "environment": {
+            "python": platform.python_version(),
+            "onnxruntime": onnxruntime.__version__,
+            "opencv": cv2.__version__,
+            "cpu_count": os.cpu_count(),
+            "destination_workers": settings.destination_workers,
+            "reduced_decode": settings.reduced_decode,
+            "output_format": settings.output_format,
+        },
+        "cases": cases,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✓ Results written to {args.json}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
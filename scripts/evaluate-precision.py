@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare reduced precision model tiers against FP32 on the bundled destinations.
+Usage:
+    python scripts/evaluate-precision.py --precision int8 fp16
+    python scripts/evaluate-precision.py --source headshot.webp --runs 20 --json precision.json
+
+For each tier this reports the source embedding cosine similarity to FP32,
+PSNR/SSIM of every swapped destination against the FP32 swap, and median
+detection and full request latency. Build the tiers first with
+scripts/quantize-models.py.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.swaparoony.core.config import settings  # noqa: E402
+from src.swaparoony.services.face_swap_service import FaceSwapService  # noqa: E402
+from src.swaparoony.utils.encoding import get_output_format  # noqa: E402
+
+# Lossless output so only the models differ between tiers
+OUTPUT_FORMAT = get_output_format("png")
+
+
+def psnr(reference: np.ndarray, image: np.ndarray) -> float:
+    return float(cv2.PSNR(reference, image))
+
+
+def ssim(reference: np.ndarray, image: np.ndarray) -> float:
+    """Mean SSIM over the grayscale images (11x11 Gaussian window)"""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    x = cv2.cvtColor(reference, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    y = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY).astype(np.float64)
+
+    def blur(a):
+        return cv2.GaussianBlur(a, (11, 11), 1.5)
+
+    mu_x, mu_y = blur(x), blur(y)
+    var_x = blur(x * x) - mu_x**2
+    var_y = blur(y * y) - mu_y**2
+    cov = blur(x * y) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov + c2)) / (
+        (mu_x**2 + mu_y**2 + c1) * (var_x + var_y + c2)
+    )
+    return float(ssim_map.mean())
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def load_service(precision: str) -> FaceSwapService:
+    settings.model_precision = precision
+    # Measure the models, not the caches
+    settings.source_cache_bytes = 0
+    settings.result_cache_bytes = 0
+    settings.destination_cache_enabled = False
+    service = FaceSwapService()
+    service.initialize_models()
+    return service
+
+
+def evaluate(service: FaceSwapService, source_data: bytes, runs: int) -> dict:
+    image, _, face = service._analyze_source(source_data, 1)
+    results, _ = service.swap_destinations(
+        source_data, raw=True, output_format=OUTPUT_FORMAT
+    )
+    swapped = {
+        r.destination_name: cv2.imdecode(np.frombuffer(r.image_data, np.uint8), 1)
+        for r in results
+        if r.error is None
+    }
+
+    detect_ms, request_ms = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        service._get_faces(image)
+        detect_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        service.swap_destinations(source_data, raw=True, output_format=OUTPUT_FORMAT)
+        request_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "embedding": face.normed_embedding,
+        "swapped": swapped,
+        "detect_ms": statistics.median(detect_ms),
+        "request_ms": statistics.median(request_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--precision", nargs="+", choices=["int8", "fp16"], default=["int8"]
+    )
+    parser.add_argument("--source", default="headshot.webp")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    args = parser.parse_args()
+
+    source_data = Path(args.source).read_bytes()
+    baseline = evaluate(load_service("fp32"), source_data, args.runs)
+
+    report = {
+        "fp32": {
+            "detect_ms": baseline["detect_ms"],
+            "request_ms": baseline["request_ms"],
+        }
+    }
+    for precision in args.precision:
+        result = evaluate(load_service(precision), source_data, args.runs)
+        destinations = {
+            name: {
+                "psnr": psnr(reference, result["swapped"][name]),
+                "ssim": ssim(reference, result["swapped"][name]),
+            }
+            for name, reference in baseline["swapped"].items()
+            if name in result["swapped"]
+        }
+        report[precision] = {
+            "embedding_cosine": cosine(baseline["embedding"], result["embedding"]),
+            "destinations": destinations,
+            "mean_psnr": statistics.mean(d["psnr"] for d in destinations.values()),
+            "mean_ssim": statistics.mean(d["ssim"] for d in destinations.values()),
+            "detect_ms": result["detect_ms"],
+            "request_ms": result["request_ms"],
+        }
+
+    print(f"{'tier':<6} {'cosine':>8} {'PSNR dB':>8} {'SSIM':>7} {'detect ms':>10} {'request ms':>11}")
+    for tier, row in report.items():
+        print(
+            f"{tier:<6} {row.get('embedding_cosine', 1.0):>8.4f} "
+            f"{row.get('mean_psnr', float('inf')):>8.2f} {row.get('mean_ssim', 1.0):>7.4f} "
+            f"{row['detect_ms']:>10.1f} {row['request_ms']:>11.1f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Build reduced precision variants of the swapper and face detector.
+Usage:
+    python scripts/quantize-models.py --precision int8
+    python scripts/quantize-models.py --precision int8 fp16 --models-root ~/.insightface/models
+
+INT8 uses ONNX Runtime dynamic quantization; FP16 needs onnxconverter-common.
+Select a tier at runtime with MODEL_PRECISION=int8 (or fp16), then compare it
+against FP32 with scripts/evaluate-precision.py.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.swaparoony.core.config import settings  # noqa: E402
+from src.swaparoony.services.model_variants import (  # noqa: E402
+    build_face_analysis_variant,
+    build_swapper_variant,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--precision", nargs="+", choices=["int8", "fp16"], default=["int8"]
+    )
+    parser.add_argument("--model-path", default=settings.model_path)
+    parser.add_argument("--face-analysis-name", default=settings.face_analysis_name)
+    parser.add_argument(
+        "--models-root",
+        type=Path,
+        default=Path.home() / ".insightface" / "models",
+        help="Directory holding insightface model packs",
+    )
+    args = parser.parse_args()
+
+    for precision in args.precision:
+        swapper = build_swapper_variant(args.model_path, precision)
+        print(f"✓ {precision} swapper: {swapper}")
+        pack = build_face_analysis_variant(
+            args.models_root.expanduser(), args.face_analysis_name, precision
+        )
+        print(f"✓ {precision} face analysis pack: {pack}")
+
+
+if __name__ == "__main__":
+    main()
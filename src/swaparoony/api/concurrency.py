@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from ..core.exceptions import ServiceOverloadedError
+
+
+class InferenceLimiter:
+    """
+    Admission control for blocking inference calls.
+
+    At most ``max_concurrent`` calls run at once, each on a dedicated worker
+    thread so the event loop stays free for other requests and ``/health``.
+    Up to ``max_queued`` further requests wait for a slot; beyond that, or
+    after waiting ``queue_timeout`` seconds, requests fail fast with
+    ServiceOverloadedError instead of piling up.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="inference"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.queued = 0
+        self.in_flight = 0
+
+    async def acquire(self):
+        """Wait for an inference slot or raise ServiceOverloadedError"""
+        if self._semaphore.locked() and self.queued >= self.max_queued:
+            raise ServiceOverloadedError(
+                "Server is busy, please retry shortly", self.retry_after
+            )
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ServiceOverloadedError(
+                "Timed out waiting for an inference slot", self.retry_after
+            )
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+
+    def release(self):
+        """Give back a slot taken with acquire()"""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the inference pool; the caller holds a slot"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the inference pool once admitted"""
+        await self.acquire()
+        try:
+            return await self.call(func, *args, **kwargs)
+        finally:
+            self.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
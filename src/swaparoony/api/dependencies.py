@@ -1,8 +1,12 @@
 from functools import lru_cache
+from .concurrency import InferenceLimiter
+from ..core.config import settings
+from ..utils.metrics import track_limiter
 from ..services.face_swap_service import FaceSwapService
 
 # Global service instance
 _face_swap_service = None
+_inference_limiter = None
 
 
 def get_face_swap_service() -> FaceSwapService:
@@ -12,3 +16,17 @@ def get_face_swap_service() -> FaceSwapService:
         _face_swap_service = FaceSwapService()
         _face_swap_service.initialize_models()
     return _face_swap_service
+
+
+def get_inference_limiter() -> InferenceLimiter:
+    """Dependency injection for the inference admission limiter"""
+    global _inference_limiter
+    if _inference_limiter is None:
+        _inference_limiter = InferenceLimiter(
+            max_concurrent=settings.max_concurrent_requests,
+            max_queued=settings.max_queued_requests,
+            queue_timeout=settings.queue_timeout,
+            retry_after=settings.retry_after,
+        )
+        track_limiter(_inference_limiter)
+    return _inference_limiter
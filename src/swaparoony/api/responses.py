@@ -0,0 +1,120 @@
+import io
+import uuid
+import zipfile
+from pathlib import Path
+from typing import List
+
+from fastapi import Response
+
+from ..models.schemas import FaceSwapMetadata
+from ..services.face_swap_service import DestinationResult
+from ..utils.encoding import OutputFormat
+
+JSON = "application/json"
+MULTIPART = "multipart/mixed"
+ZIP = "application/zip"
+
+# Response formats of /swap, in server preference order
+SUPPORTED_MEDIA_TYPES = [JSON, MULTIPART, ZIP]
+
+
+def negotiate_media_type(accept: str) -> str:
+    """
+    Pick the response format for an Accept header.
+    JSON wins ties and is used when nothing else is acceptable.
+    """
+    best, best_q = JSON, 0.0
+    for entry in accept.split(","):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        candidates = SUPPORTED_MEDIA_TYPES if media_type == "*/*" else [media_type]
+        for candidate in candidates:
+            if candidate in SUPPORTED_MEDIA_TYPES and q > best_q:
+                best, best_q = candidate, q
+                break
+    return best
+
+
+def output_filename(destination_name: str, output_format: OutputFormat) -> str:
+    """Destination name with the extension of the output codec"""
+    return Path(destination_name).stem + output_format.extension
+
+
+def _metadata_headers(metadata: FaceSwapMetadata) -> dict:
+    return {"X-Faces-Detected-In-Source": str(metadata.faces_detected_in_source)}
+
+
+def multipart_response(
+    metadata: FaceSwapMetadata,
+    results: List[DestinationResult],
+    output_format: OutputFormat,
+) -> Response:
+    """
+    Build a multipart/mixed response: one JSON metadata part followed by one
+    raw image part per swapped destination
+    """
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+
+    def part(headers: dict, content: bytes):
+        body.write(f"--{boundary}\r\n".encode())
+        for name, value in headers.items():
+            body.write(f"{name}: {value}\r\n".encode())
+        body.write(b"\r\n")
+        body.write(content)
+        body.write(b"\r\n")
+
+    part(
+        {"Content-Type": JSON, "Content-Disposition": 'inline; name="metadata"'},
+        metadata.model_dump_json().encode(),
+    )
+    for result in results:
+        filename = output_filename(result.destination_name, output_format)
+        part(
+            {
+                "Content-Type": output_format.media_type,
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Destination-Name": result.destination_name,
+            },
+            result.image_data,
+        )
+    body.write(f"--{boundary}--\r\n".encode())
+
+    return Response(
+        content=body.getvalue(),
+        media_type=f"{MULTIPART}; boundary={boundary}",
+        headers=_metadata_headers(metadata),
+    )
+
+
+def zip_response(
+    metadata: FaceSwapMetadata,
+    results: List[DestinationResult],
+    output_format: OutputFormat,
+) -> Response:
+    """Build a zip archive of the swapped images plus a metadata.json entry"""
+    body = io.BytesIO()
+    # Images are already compressed, so store them as-is
+    with zipfile.ZipFile(body, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("metadata.json", metadata.model_dump_json())
+        for result in results:
+            archive.writestr(
+                output_filename(result.destination_name, output_format),
+                result.image_data,
+            )
+
+    return Response(
+        content=body.getvalue(),
+        media_type=ZIP,
+        headers={
+            "Content-Disposition": 'attachment; filename="swaparoony.zip"',
+            **_metadata_headers(metadata),
+        },
+    )
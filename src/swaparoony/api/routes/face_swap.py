@@ -1,22 +1,152 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from typing import List
+from fastapi import (
+    APIRouter,
+    Depends,
+    UploadFile,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
 
-from ...services.face_swap_service import FaceSwapService
-from ...models.schemas import FaceSwapResponse, SwappedImage, ErrorResponse
+from ...services.face_swap_service import DestinationResult, FaceSwapService
+from ...services.profiling import profiling_allowed, run_profiled, zip_profile
+from ...models.schemas import (
+    DestinationFailure,
+    FaceSwapMetadata,
+    FaceSwapResponse,
+    FaceSwapStreamSummary,
+    StreamedSwappedImage,
+    SwappedImage,
+    ErrorResponse,
+)
+from ...utils.encoding import OutputFormat, resolve_output_format
 from ...utils.image_utils import validate_image_file
-from ...api.dependencies import get_face_swap_service
+from ...utils.metrics import record_request
+from ...utils.timing import stage
+from ...api.concurrency import InferenceLimiter
+from ...api.responses import (
+    JSON,
+    MULTIPART,
+    multipart_response,
+    negotiate_media_type,
+    zip_response,
+)
+from ...api.dependencies import get_face_swap_service, get_inference_limiter
 from ...core.exceptions import (
     NoFaceDetectedError,
     InsufficientFacesError,
     InvalidImageError,
+    InvalidOutputFormatError,
     FaceSwapError,
+    ServiceOverloadedError,
 )
 
 router = APIRouter()
 
 
-@router.post("/swap", response_model=FaceSwapResponse)
+def _to_http_exception(e: Exception) -> HTTPException:
+    """Map face swap errors to HTTP responses"""
+    if isinstance(
+        e,
+        (
+            NoFaceDetectedError,
+            InsufficientFacesError,
+            InvalidImageError,
+            InvalidOutputFormatError,
+        ),
+    ):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, ServiceOverloadedError):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, FaceSwapError):
+        return HTTPException(status_code=500, detail=str(e))
+    return HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+
+def get_output_format(
+    output_format: Optional[str] = Form(
+        None, description="Output codec: jpeg, webp or png"
+    ),
+    output_quality: Optional[int] = Form(
+        None, ge=1, le=100, description="Encoder quality for jpeg and webp"
+    ),
+    output_chroma_subsampling: Optional[str] = Form(
+        None, description="JPEG chroma subsampling: 420, 422 or 444"
+    ),
+    output_max_edge: Optional[int] = Form(
+        None, ge=0, description="Longest output edge in pixels, 0 for full size"
+    ),
+) -> OutputFormat:
+    """Per-request output encoding, falling back to the configured defaults"""
+    try:
+        return resolve_output_format(
+            output_format, output_quality, output_chroma_subsampling, output_max_edge
+        )
+    except InvalidOutputFormatError as e:
+        raise _to_http_exception(e)
+
+
+def get_profiling_flag(
+    x_profile_token: Optional[str] = Header(None),
+    profile_token: Optional[str] = Query(None),
+) -> bool:
+    """Whether to profile this request; a wrong admin token is rejected"""
+    token = x_profile_token or profile_token
+    if token is None:
+        return False
+    if not profiling_allowed(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    return True
+
+
+async def _run_swap(
+    limiter: InferenceLimiter,
+    service: FaceSwapService,
+    profile: bool,
+    method: str,
+    **kwargs,
+) -> Tuple[Any, Optional[str]]:
+    """
+    Run a service method through the limiter, under the profiler if asked
+    Returns: (method result, profile_id or None)
+    """
+    if profile:
+        return await limiter.run(run_profiled, service, method, **kwargs)
+    return await limiter.run(getattr(service, method), **kwargs), None
+
+
+def _failures(results: List[DestinationResult]) -> List[DestinationFailure]:
+    return [
+        DestinationFailure(destination_name=r.destination_name, detail=r.error)
+        for r in results
+        if r.error is not None
+    ]
+
+
+@router.post(
+    "/swap",
+    response_model=FaceSwapResponse,
+    responses={
+        200: {
+            "content": {"multipart/mixed": {}, "application/zip": {}},
+            "description": "JSON with base64 images by default; raw images "
+            "when the Accept header asks for multipart/mixed or application/zip",
+        }
+    },
+)
 async def swap_faces(
+    request: Request,
+    response: Response,
     image: UploadFile = File(..., description="Source image with face to swap"),
     source_face_id: int = Form(
         1, ge=1, description="Face position in source image (starting at 1)"
@@ -24,20 +154,68 @@ async def swap_faces(
     destination_face_id: int = Form(
         1, ge=1, description="Face position in destination images (starting at 1)"
     ),
+    output: OutputFormat = Depends(get_output_format),
+    profile: bool = Depends(get_profiling_flag),
     service: FaceSwapService = Depends(get_face_swap_service),
+    limiter: InferenceLimiter = Depends(get_inference_limiter),
 ):
     """
-    Swap face from uploaded image onto all configured destination images
+    Swap face from uploaded image onto all configured destination images.
+
+    Responds with JSON and base64 images by default. Clients sending
+    ``Accept: multipart/mixed`` get a JSON metadata part followed by one raw
+    image part per destination; ``Accept: application/zip`` returns the
+    images and a metadata.json in a zip archive.
+
+    With the admin ``X-Profile-Token`` header the request is profiled and the
+    stored profile's id is returned in the ``X-Profile-Id`` header.
     """
     try:
         # Validate and read image
-        image_data = await validate_image_file(image)
+        with stage("upload_read"):
+            image_data = await validate_image_file(image)
+
+        media_type = negotiate_media_type(request.headers.get("accept", ""))
+        if media_type != JSON:
+            (results, faces_detected), profile_id = await _run_swap(
+                limiter,
+                service,
+                profile,
+                "swap_destinations",
+                source_image_data=image_data,
+                source_face_id=source_face_id,
+                dest_face_id=destination_face_id,
+                raw=True,
+                output_format=output,
+            )
+            swapped = [r for r in results if r.error is None]
+            metadata = FaceSwapMetadata(
+                success=True,
+                message=f"Successfully swapped face onto {len(swapped)} images",
+                faces_detected_in_source=faces_detected,
+                destination_names=[r.destination_name for r in swapped],
+                failures=_failures(results),
+            )
+            with stage("serialization"):
+                if media_type == MULTIPART:
+                    binary = multipart_response(metadata, swapped, output)
+                else:
+                    binary = zip_response(metadata, swapped, output)
+            if profile_id is not None:
+                binary.headers["X-Profile-Id"] = profile_id
+            record_request("swap")
+            return binary
 
-        # Process face swap
-        results, faces_detected = service.process_face_swap_request(
+        # Process face swap off the event loop, subject to admission control
+        (results, faces_detected), profile_id = await _run_swap(
+            limiter,
+            service,
+            profile,
+            "process_face_swap_request",
             source_image_data=image_data,
             source_face_id=source_face_id,
             dest_face_id=destination_face_id,
+            output_format=output,
         )
 
         # Build response
@@ -46,6 +224,9 @@ async def swap_faces(
             for base64_data, filename in results
         ]
 
+        if profile_id is not None:
+            response.headers["X-Profile-Id"] = profile_id
+        record_request("swap")
         return FaceSwapResponse(
             success=True,
             message=f"Successfully swapped face onto {len(swapped_images)} images",
@@ -53,23 +234,145 @@ async def swap_faces(
             faces_detected_in_source=faces_detected,
         )
 
-    except NoFaceDetectedError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except InsufficientFacesError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except InvalidImageError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except FaceSwapError as e:
-        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+        record_request("swap", e)
+        raise _to_http_exception(e)
+
+
+def _release_once(limiter: InferenceLimiter) -> Callable[[], None]:
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            limiter.release()
+
+    return release
+
+
+async def _stream_ndjson(
+    limiter: InferenceLimiter,
+    results: Iterator[DestinationResult],
+    faces_detected: int,
+    release: Callable[[], None],
+) -> AsyncIterator[str]:
+    """Emit one NDJSON line per finished destination, then a summary line"""
+    failed = []
+    swapped = 0
+    try:
+        while True:
+            result = await limiter.call(next, results, None)
+            if result is None:
+                break
+            if result.error is not None:
+                failed.append(result)
+                continue
+            swapped += 1
+            line = StreamedSwappedImage(
+                image_data=result.image_data, destination_name=result.destination_name
+            )
+            yield line.model_dump_json() + "\n"
+
+        summary = FaceSwapStreamSummary(
+            success=True,
+            message=f"Successfully swapped face onto {swapped} images",
+            faces_detected_in_source=faces_detected,
+            failures=_failures(failed),
+        )
+        yield summary.model_dump_json() + "\n"
+        record_request("swap_stream")
+    except Exception as e:
+        record_request("swap_stream", e)
+        raise
+    finally:
+        release()
+
+
+@router.post("/swap/stream")
+async def swap_faces_stream(
+    image: UploadFile = File(..., description="Source image with face to swap"),
+    source_face_id: int = Form(
+        1, ge=1, description="Face position in source image (starting at 1)"
+    ),
+    destination_face_id: int = Form(
+        1, ge=1, description="Face position in destination images (starting at 1)"
+    ),
+    output: OutputFormat = Depends(get_output_format),
+    service: FaceSwapService = Depends(get_face_swap_service),
+    limiter: InferenceLimiter = Depends(get_inference_limiter),
+):
+    """
+    Swap face from uploaded image onto all configured destination images,
+    streaming results as NDJSON. Each swapped image is sent as a
+    ``{"type": "image", ...}`` line as soon as it is ready, followed by one
+    ``{"type": "summary", ...}`` line listing any failed destinations.
+    """
+    try:
+        with stage("upload_read"):
+            image_data = await validate_image_file(image)
+        await limiter.acquire()
+    except Exception as e:
+        record_request("swap_stream", e)
+        raise _to_http_exception(e)
+
+    # Source errors surface here, before the response starts
+    try:
+        results, faces_detected = await limiter.call(
+            service.iter_destinations,
+            source_image_data=image_data,
+            source_face_id=source_face_id,
+            dest_face_id=destination_face_id,
+            output_format=output,
+        )
+    except Exception as e:
+        limiter.release()
+        record_request("swap_stream", e)
+        raise _to_http_exception(e)
+
+    # The slot is held until the stream ends; the background task covers
+    # responses that are abandoned before streaming starts
+    release = _release_once(limiter)
+    return StreamingResponse(
+        _stream_ndjson(limiter, results, faces_detected, release),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release),
+    )
 
 
 @router.get("/health")
-async def health_check(service: FaceSwapService = Depends(get_face_swap_service)):
+async def health_check(
+    service: FaceSwapService = Depends(get_face_swap_service),
+    limiter: InferenceLimiter = Depends(get_inference_limiter),
+):
     """Health check endpoint"""
     return {
         "status": "healthy",
         "models_loaded": service._initialized,
         "destination_images_count": len(service.destination_images),
+        "in_flight_requests": limiter.in_flight,
+        "queued_requests": limiter.queued,
+        "source_cache": service.source_cache.stats(),
+        "result_cache": service.result_cache.stats(),
+        "onnxruntime": service.session_info(),
     }
+
+
+@router.get("/profiles/{profile_id}", include_in_schema=False)
+async def download_profile(
+    profile_id: str,
+    x_profile_token: Optional[str] = Header(None),
+    profile_token: Optional[str] = Query(None),
+):
+    """Stored profile of a request as a zip (cProfile stats and ORT traces)"""
+    if not profiling_allowed(x_profile_token or profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    try:
+        archive = zip_profile(profile_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.zip"'},
+    )
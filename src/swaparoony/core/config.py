@@ -1,17 +1,33 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     # Model paths
     model_path: str = "models/inswapper_128.onnx"
     face_analysis_name: str = "buffalo_l"
+    # Precision tier: fp32 (original models), fp16 or int8. Variants are built
+    # with scripts/quantize_models.py as models/<name>.<precision>.onnx and the
+    # <face_analysis_name>_<precision> model pack
+    model_precision: str = "fp32"
 
     # Detection settings
     ctx_id: int = 0
     det_size: tuple = (640, 640)
 
+    # ONNX Runtime sessions (detector, recognizer and inswapper)
+    ort_providers: Optional[List[str]] = None  # Priority order, None = all available
+    ort_intra_op_threads: int = 0  # 0 lets ONNX Runtime pick (one per core)
+    ort_inter_op_threads: int = 0
+    ort_graph_optimization: str = "all"  # disable, basic, extended or all
+    ort_execution_mode: str = "sequential"  # sequential or parallel
+    ort_enable_mem_arena: bool = True
+    ort_enable_mem_pattern: bool = True
+
+    # Decode large JPEG uploads at 1/2, 1/4 or 1/8 scale for detection
+    reduced_decode: bool = True
+
     # Destination images for face swapping
     destination_images: List[str] = [
         "data/photos-for-ai/destination/224651.jpg",
@@ -20,12 +36,53 @@ class Settings(BaseSettings):
         "data/photos-for-ai/destination/10591115146_c8772afc14_b.jpg",
     ]
 
+    # On-disk cache of decoded destinations and their face index, stored in
+    # <destination dir>/.swaparoony-cache unless a directory is given
+    destination_cache_enabled: bool = True
+    destination_cache_dir: Optional[str] = None
+    # Downscaled copies (longest edge in pixels) prepared for each destination.
+    # Requests with an output max edge swap on the smallest tier covering it
+    destination_tiers: List[int] = [512, 1024]
+
+    # In-memory LRU of decoded uploads and their faces, keyed by content hash,
+    # so resubmitting a photo with other face ids skips decode and detection
+    source_cache_bytes: int = 256 * 1024 * 1024  # 0 disables
+    # In-memory LRU of encoded swap results for repeated identical requests
+    result_cache_bytes: int = 128 * 1024 * 1024  # 0 disables
+
+    # Default output encoding; requests may override each value
+    output_format: str = "jpeg"  # jpeg, webp or png
+    output_quality: Optional[int] = None  # 1-100, None uses the codec default
+    output_chroma_subsampling: Optional[str] = None  # JPEG only: 420, 422 or 444
+    output_max_edge: int = 0  # Longest output edge in pixels, 0 = full size
+
     # API settings
     max_file_size: int = 2 * 1024 * 1024  # 2MB
     allowed_extensions: List[str] = [".jpg", ".jpeg", ".png", ".webp"]
 
     # Performance
     max_concurrent_requests: int = 6
+    # Requests allowed to wait for an inference slot before new ones get a 503
+    max_queued_requests: int = 12
+    queue_timeout: float = 30.0  # Seconds a queued request may wait for a slot
+    retry_after: int = 5  # Retry-After seconds sent with 503 responses
+    # Threads finishing (paste-back + encode) destinations of one request in
+    # parallel; 1 finishes them one after another
+    destination_workers: int = 4
+    # Cross-request detection batching: up to this many uploads share one
+    # detector run (1 disables), waiting at most the timeout for a batch to fill
+    detection_batch_size: int = 1
+    detection_batch_timeout_ms: float = 5.0
+    # Blend swapped faces back within the face region only; False blends over
+    # the whole destination like INSwapper.get (output differs by at most 1)
+    roi_paste_back: bool = True
+
+    # Observability: per-stage latency histograms on /metrics
+    metrics_enabled: bool = True
+    # On-demand profiling of single requests sending this token in the
+    # X-Profile-Token header (or profile_token query parameter); unset disables it
+    profiling_token: Optional[str] = None
+    profile_dir: str = "profiles"  # Where profiled requests are stored
 
     class Config:
         env_file = ".env"
@@ -22,7 +22,27 @@ class InvalidImageError(FaceSwapError):
     pass
 
 
+class InvalidOutputFormatError(FaceSwapError):
+    """Raised when the requested output codec or encoder settings are invalid"""
+
+    pass
+
+
+class UnknownDestinationError(FaceSwapError):
+    """Raised when a request selects a destination that is not in the gallery"""
+
+    pass
+
+
 class ModelLoadError(FaceSwapError):
     """Raised when face swap models fail to load"""
 
     pass
+
+
+class ServiceOverloadedError(FaceSwapError):
+    """Raised when the inference queue is full and a request is turned away"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
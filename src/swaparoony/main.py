@@ -1,16 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from .api.routes.face_swap import router as face_swap_router
-from .api.dependencies import get_face_swap_service
+from .api.dependencies import get_face_swap_service, get_inference_limiter
 from .core.config import settings
 from .core.exceptions import ModelLoadError
+from .utils.metrics import CONTENT_TYPE, enable_stage_metrics, render_metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize models
+    if settings.metrics_enabled:
+        enable_stage_metrics()
     try:
         service = get_face_swap_service()
         print("Face swap service initialized successfully")
@@ -22,6 +25,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown: Clean up if needed
     print("Shutting down face swap service")
+    get_inference_limiter().shutdown()
+    get_face_swap_service().shutdown()
 
 
 def create_app() -> FastAPI:
@@ -52,6 +57,11 @@ def create_app() -> FastAPI:
             "status": "running",
         }
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics"""
+        return Response(render_metrics(), media_type=CONTENT_TYPE)
+
     return app
 
 
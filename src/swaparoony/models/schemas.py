@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 import base64
 
 
@@ -15,6 +15,39 @@ class FaceSwapResponse(BaseModel):
     faces_detected_in_source: int = 0
 
 
+class DestinationFailure(BaseModel):
+    destination_name: str = Field(description="Name of the destination image")
+    detail: str = Field(description="Why the swap failed for this destination")
+
+
+class FaceSwapMetadata(BaseModel):
+    """Metadata sent alongside raw binary swap results"""
+
+    success: bool
+    message: str
+    faces_detected_in_source: int = 0
+    destination_names: List[str] = Field(
+        default=[], description="Destinations of the returned images, in order"
+    )
+    failures: List[DestinationFailure] = []
+
+
+class StreamedSwappedImage(SwappedImage):
+    """One NDJSON line of a streamed swap, sent as soon as it is ready"""
+
+    type: Literal["image"] = "image"
+
+
+class FaceSwapStreamSummary(BaseModel):
+    """Final NDJSON line of a streamed swap"""
+
+    type: Literal["summary"] = "summary"
+    success: bool
+    message: str
+    faces_detected_in_source: int = 0
+    failures: List[DestinationFailure] = []
+
+
 class ErrorResponse(BaseModel):
     success: bool = False
     error: str
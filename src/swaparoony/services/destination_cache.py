@@ -0,0 +1,105 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from insightface.app.common import Face
+
+# Bump when the on-disk layout changes so old entries are ignored
+CACHE_VERSION = 1
+
+# Face attributes persisted with each destination entry
+FACE_ATTRIBUTES = ("bbox", "kps", "det_score", "embedding")
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 of an image file's raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class DestinationCache:
+    """
+    On-disk cache of decoded destination pixels and their face index.
+
+    Each destination is stored as a pair of files in ``cache_dir``: a ``.npy``
+    holding the decoded BGR image and a ``.npz`` holding its sorted faces.
+    Entries are named after the source filename, the face analysis model,
+    ``det_size`` and the file content hash, so a changed image, model or
+    detection size simply misses and is rebuilt on its own.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str, det_size: tuple):
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        self.det_size = tuple(det_size)
+
+    def _prefix(self, filename: str) -> str:
+        width, height = self.det_size
+        return f"{filename}.v{CACHE_VERSION}-{self.model_name}-{width}x{height}"
+
+    def _paths(self, filename: str, digest: str) -> Tuple[Path, Path]:
+        stem = f"{self._prefix(filename)}.{digest[:16]}"
+        return self.cache_dir / f"{stem}.npy", self.cache_dir / f"{stem}.npz"
+
+    def load(self, filename: str, digest: str) -> Optional[Tuple[np.ndarray, List]]:
+        """Return (image, sorted_faces) for a valid entry, or None on a miss"""
+        image_path, faces_path = self._paths(filename, digest)
+        if not image_path.exists() or not faces_path.exists():
+            return None
+
+        try:
+            image = np.load(image_path)
+            with np.load(faces_path) as stored:
+                if str(stored["digest"]) != digest:
+                    return None
+                faces = self._unpack_faces(stored)
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable destination cache entry {image_path}: {e}")
+            return None
+
+        return image, faces
+
+    def save(self, filename: str, digest: str, image: np.ndarray, faces: List):
+        """Write an entry and drop older entries for the same file and config"""
+        image_path, faces_path = self._paths(filename, digest)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(image_path, lambda f: np.save(f, image))
+            self._atomic_write(
+                faces_path,
+                lambda f: np.savez(f, digest=digest, **self._pack_faces(faces)),
+            )
+        except OSError as e:
+            # A read-only gallery volume just means every start rebuilds
+            print(f"Warning: Could not write destination cache for {filename}: {e}")
+            return
+
+        for stale in self.cache_dir.glob(f"{self._prefix(filename)}.*"):
+            if stale not in (image_path, faces_path):
+                stale.unlink(missing_ok=True)
+
+    @staticmethod
+    def _atomic_write(path: Path, write):
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _pack_faces(faces: List) -> dict:
+        arrays = {"count": np.array(len(faces))}
+        for attr in FACE_ATTRIBUTES:
+            values = [getattr(face, attr, None) for face in faces]
+            if faces and all(value is not None for value in values):
+                arrays[attr] = np.stack([np.asarray(value) for value in values])
+        return arrays
+
+    @staticmethod
+    def _unpack_faces(stored) -> List:
+        count = int(stored["count"])
+        present = [attr for attr in FACE_ATTRIBUTES if attr in stored.files]
+        columns = {attr: stored[attr] for attr in present}
+        return [
+            Face(**{attr: columns[attr][i] for attr in present}) for i in range(count)
+        ]
@@ -0,0 +1,195 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from insightface.model_zoo.scrfd import distance2bbox, distance2kps
+
+# (detections as [x1, y1, x2, y2, score] rows, keypoints or None)
+Detections = Tuple[np.ndarray, Optional[np.ndarray]]
+
+
+def supports_batching(det_model) -> bool:
+    """Whether the detector's ONNX input accepts a batch dimension other than 1"""
+    batch_dim = det_model.session.get_inputs()[0].shape[0]
+    return not isinstance(batch_dim, int) or batch_dim < 1
+
+
+def letterbox(image: np.ndarray, input_size: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+    """
+    Resize into input_size (width, height) keeping the aspect ratio and pad
+    bottom/right, exactly as SCRFD.detect does
+    Returns: (padded_image, scale from original to padded pixels)
+    """
+    im_ratio = float(image.shape[0]) / image.shape[1]
+    model_ratio = float(input_size[1]) / input_size[0]
+    if im_ratio > model_ratio:
+        new_height = input_size[1]
+        new_width = int(new_height / im_ratio)
+    else:
+        new_width = input_size[0]
+        new_height = int(new_width * im_ratio)
+    det_scale = float(new_height) / image.shape[0]
+    padded = np.zeros((input_size[1], input_size[0], 3), dtype=np.uint8)
+    padded[:new_height, :new_width, :] = cv2.resize(image, (new_width, new_height))
+    return padded, det_scale
+
+
+def _anchor_centers(det_model, height: int, width: int, stride: int) -> np.ndarray:
+    key = (height, width, stride)
+    centers = det_model.center_cache.get(key)
+    if centers is None:
+        centers = np.stack(np.mgrid[:height, :width][::-1], axis=-1).astype(np.float32)
+        centers = (centers * stride).reshape((-1, 2))
+        if det_model._num_anchors > 1:
+            centers = np.stack([centers] * det_model._num_anchors, axis=1).reshape(
+                (-1, 2)
+            )
+        if len(det_model.center_cache) < 100:
+            det_model.center_cache[key] = centers
+    return centers
+
+
+def decode_detections(
+    det_model, net_outs: List[np.ndarray], input_size: Tuple[int, int], det_scale: float
+) -> Detections:
+    """
+    SCRFD post-processing (anchor decoding, thresholding and NMS) for one
+    image's outputs, as in SCRFD.forward followed by SCRFD.detect
+    """
+    input_width, input_height = input_size
+    fmc = det_model.fmc
+    scores_list, bboxes_list, kpss_list = [], [], []
+    for idx, stride in enumerate(det_model._feat_stride_fpn):
+        scores = net_outs[idx]
+        bbox_preds = net_outs[idx + fmc] * stride
+        centers = _anchor_centers(
+            det_model, input_height // stride, input_width // stride, stride
+        )
+        pos_inds = np.where(scores >= det_model.det_thresh)[0]
+        scores_list.append(scores[pos_inds])
+        bboxes_list.append(distance2bbox(centers, bbox_preds)[pos_inds])
+        if det_model.use_kps:
+            kpss = distance2kps(centers, net_outs[idx + fmc * 2] * stride)
+            kpss_list.append(kpss.reshape((kpss.shape[0], -1, 2))[pos_inds])
+
+    scores = np.vstack(scores_list)
+    order = scores.ravel().argsort()[::-1]
+    bboxes = np.vstack(bboxes_list) / det_scale
+    pre_det = np.hstack((bboxes, scores)).astype(np.float32, copy=False)[order, :]
+    keep = det_model.nms(pre_det)
+    det = pre_det[keep, :]
+
+    kpss = None
+    if det_model.use_kps:
+        kpss = (np.vstack(kpss_list) / det_scale)[order, :, :][keep, :, :]
+    return det, kpss
+
+
+class _DetectionRequest:
+    def __init__(self, image: np.ndarray):
+        self.image = image
+        self.future: Future = Future()
+
+
+class DetectionBatcher:
+    """
+    Cross-request micro-batching for the SCRFD face detector.
+
+    Requests from concurrent threads are queued; a single worker thread
+    collects up to ``max_batch`` images, waiting at most ``max_wait`` seconds
+    after the first one arrives, letterboxes them to the detector input size
+    and runs one batched ONNX call. Per-image outputs are then decoded with
+    the same post-processing as ``SCRFD.detect``. A lone request is passed
+    straight to ``det_model.detect``.
+    """
+
+    def __init__(self, det_model, max_batch: int, max_wait: float):
+        self.det_model = det_model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches_run = 0
+        self.images_detected = 0
+        self._queue: "queue.Queue[Optional[_DetectionRequest]]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="detection-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def detect(self, image: np.ndarray) -> Detections:
+        """Detect faces in one image; blocks until its batch has run"""
+        request = _DetectionRequest(image)
+        self._queue.put(request)
+        return request.future.result()
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: _DetectionRequest) -> Tuple[List[_DetectionRequest], bool]:
+        """Gather a batch after its first request; True if shutdown was requested"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            try:
+                results = self._detect_batch([r.image for r in batch])
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _detect_batch(self, images: List[np.ndarray]) -> List[Detections]:
+        self.batches_run += 1
+        self.images_detected += len(images)
+        if len(images) == 1:
+            return [self.det_model.detect(images[0], max_num=0, metric="default")]
+
+        det_model = self.det_model
+        input_size = tuple(det_model.input_size)
+        letterboxed = [letterbox(image, input_size) for image in images]
+        blob = cv2.dnn.blobFromImages(
+            [padded for padded, _ in letterboxed],
+            1.0 / det_model.input_std,
+            input_size,
+            (det_model.input_mean, det_model.input_mean, det_model.input_mean),
+            swapRB=True,
+        )
+        net_outs = det_model.session.run(
+            det_model.output_names, {det_model.input_name: blob}
+        )
+        # Batched exports return (N, anchors, C); flattened ones stack each
+        # image's anchors along the first axis
+        per_image = [
+            out if det_model.batched else out.reshape((len(images), -1, out.shape[-1]))
+            for out in net_outs
+        ]
+        return [
+            decode_detections(
+                det_model, [out[i] for out in per_image], input_size, det_scale
+            )
+            for i, (_, det_scale) in enumerate(letterboxed)
+        ]
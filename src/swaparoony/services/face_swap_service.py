@@ -1,45 +1,145 @@
 import cv2
 import numpy as np
 import base64
-from typing import List, Tuple
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from pathlib import Path
 import insightface
 from insightface.app import FaceAnalysis
-import onnxruntime  # Import the onnxruntime library
-
+from insightface.app.common import Face
+
+from . import swap_ops
+from .destination_cache import DestinationCache, content_digest
+from .model_variants import face_analysis_pack, variant_path
+from .onnx_sessions import (
+    apply_session_config,
+    describe_session_config,
+    session_providers,
+)
+from .detection_batcher import DetectionBatcher, supports_batching
 from ..core.config import settings
+from ..utils.cache import ByteBudgetLRU, SingleFlight
+from ..utils.encoding import (
+    OutputFormat,
+    encode_image,
+    resize_to_max_edge,
+    resolve_output_format,
+)
+from ..utils.image_utils import REDUCED_DECODE_FLAGS, detection_reduction
+from ..utils.metrics import count_destination_failures, track_caches
+from ..utils.timing import stage
 from ..core.exceptions import (
+    FaceSwapError,
     NoFaceDetectedError,
     InsufficientFacesError,
     InvalidImageError,
     ModelLoadError,
+    UnknownDestinationError,
 )
 
 
+class DestinationResult(NamedTuple):
+    destination_name: str
+    # Base64 string, or JPEG bytes when raw output was requested; None if
+    # this destination failed
+    image_data: Optional[Union[str, bytes]]
+    error: Optional[str] = None
+
+
+def _capture(func: Callable, *args) -> Union[object, Exception]:
+    """Call func, returning any exception instead of raising it"""
+    try:
+        return func(*args)
+    except Exception as e:
+        return e
+
+
+def _resized_faces(faces: List[Face], scale_x: float, scale_y: float) -> List[Face]:
+    """Copies of faces with their geometry mapped onto a resized image"""
+    scale = np.array([scale_x, scale_y], dtype=np.float32)
+    return [
+        Face(
+            bbox=face.bbox * np.tile(scale, 2),
+            kps=face.kps * scale if face.kps is not None else None,
+            det_score=face.det_score,
+        )
+        for face in faces
+    ]
+
+
 class FaceSwapService:
     def __init__(self):
         self.app = None
         self.swapper = None
         self.destination_images = []  # List of (image_array, filename) tuples
+        self.destination_faces: Dict[str, List] = {}  # filename -> sorted faces
+        # filename -> downscaled (long_edge, image, faces) tiers, smallest first
+        self.destination_tiers: Dict[str, List[Tuple[int, np.ndarray, List]]] = {}
         self._initialized = False
+        self._detection_batcher: Optional[DetectionBatcher] = None
+
+        # Decoded uploads, their sorted faces and decode scale, keyed by
+        # content digest
+        self.source_cache = ByteBudgetLRU(settings.source_cache_bytes)
+        # Encoded swap results per (source digest, source_face_id,
+        # dest_face_id, output_format, destination), and in-progress swaps
+        # that identical concurrent requests wait on
+        self.result_cache = ByteBudgetLRU(settings.result_cache_bytes)
+        self._inflight_swaps = SingleFlight()
+        track_caches([("source", self.source_cache), ("result", self.result_cache)])
+
+        # Paste-back and encoding release the GIL, so destinations of one
+        # request are finished in parallel
+        self._destination_executor = None
+        if settings.destination_workers > 1:
+            self._destination_executor = ThreadPoolExecutor(
+                max_workers=settings.destination_workers,
+                thread_name_prefix="destination",
+            )
 
     def initialize_models(self):
         """Initialize face analysis and swapper models, preload destination images"""
         try:
+            providers = session_providers()
+
+            # Detection runs on every image; the recognition model is only
+            # used to embed the selected source face
             self.app = FaceAnalysis(
-                name=settings.face_analysis_name,
+                name=face_analysis_pack(
+                    settings.face_analysis_name, settings.model_precision
+                ),
                 allowed_modules=["detection", "recognition"],
+                providers=providers,
             )
             self.app.prepare(ctx_id=settings.ctx_id, det_size=settings.det_size)
 
             self.swapper = insightface.model_zoo.get_model(
-                settings.model_path, download=False, download_zip=False
+                variant_path(settings.model_path, settings.model_precision),
+                download=False,
+                download_zip=False,
+                providers=providers,
             )
 
+            # insightface does not forward SessionOptions, so sessions are
+            # recreated with the configured threads and graph options
+            apply_session_config(list(self.app.models.values()) + [self.swapper])
+            self._start_detection_batcher()
+
             # Log the ONNX Runtime execution providers
-            providers = onnxruntime.get_available_providers()
             print(
-                f"ONNX Runtime is using the following execution providers: {providers}"
+                "ONNX Runtime is using the following execution providers: "
+                f"{self.swapper.session.get_providers()}"
             )
 
             # Preload destination images
@@ -49,9 +149,54 @@ class FaceSwapService:
         except Exception as e:
             raise ModelLoadError(f"Failed to initialize models: {str(e)}")
 
+    def _start_detection_batcher(self):
+        """Batch detection across concurrent requests when configured"""
+        if settings.detection_batch_size <= 1:
+            return
+        if not supports_batching(self.app.det_model):
+            print(
+                "Warning: Detection model has a fixed batch size, "
+                "detection batching disabled"
+            )
+            return
+        self._detection_batcher = DetectionBatcher(
+            self.app.det_model,
+            max_batch=settings.detection_batch_size,
+            max_wait=settings.detection_batch_timeout_ms / 1000.0,
+        )
+
+    def session_info(self) -> Dict:
+        """Effective ONNX Runtime session settings"""
+        info = describe_session_config()
+        if self.swapper is not None:
+            options = self.swapper.session.get_session_options()
+            info.update(
+                active_providers=self.swapper.session.get_providers(),
+                intra_op_threads=options.intra_op_num_threads,
+                inter_op_threads=options.inter_op_num_threads,
+            )
+        return info
+
+    def shutdown(self):
+        """Stop background workers"""
+        if self._detection_batcher is not None:
+            self._detection_batcher.shutdown()
+            self._detection_batcher = None
+        if self._destination_executor is not None:
+            self._destination_executor.shutdown(wait=False)
+
     def _load_destination_images(self):
-        """Load all destination images into memory"""
+        """Load all destination images into memory and index their faces.
+
+        Destinations are static, so their detections (bboxes and keypoints)
+        are computed once here instead of on every swap request. With the
+        destination cache enabled, unchanged images are read back from disk
+        and only new or modified files are decoded and detected.
+        """
         self.destination_images = []
+        self.destination_faces = {}
+        self.destination_tiers = {}
+        rebuilt = 0
 
         for dest_path in settings.destination_images:
             path = Path(dest_path)
@@ -59,17 +204,90 @@ class FaceSwapService:
                 print(f"Warning: Destination image not found: {dest_path}")
                 continue
 
-            image = cv2.imread(str(path))
-            if image is None:
+            if settings.destination_cache_enabled:
+                entry, was_rebuilt = self._load_cached_destination(path)
+                rebuilt += was_rebuilt
+            else:
+                entry = self._load_destination(cv2.imread(str(path)))
+            if entry is None:
                 print(f"Warning: Could not load image: {dest_path}")
                 continue
 
+            image, faces = entry
             self.destination_images.append((image, path.name))
+            self.destination_faces[path.name] = faces
+            self.destination_tiers[path.name] = self._build_tiers(image, faces)
 
         if not self.destination_images:
             raise ModelLoadError("No destination images could be loaded")
 
         print(f"Loaded {len(self.destination_images)} destination images into memory")
+        if settings.destination_cache_enabled:
+            print(f"Destination cache: {rebuilt} entries rebuilt")
+
+    def _load_destination(self, image: Optional[np.ndarray]):
+        """Index faces for a decoded destination; None if decoding failed"""
+        if image is None:
+            return None
+        return image, self._get_faces(image)
+
+    @staticmethod
+    def _build_tiers(
+        image: np.ndarray, faces: List[Face]
+    ) -> List[Tuple[int, np.ndarray, List[Face]]]:
+        """
+        Downscaled copies of a destination for each configured tier smaller
+        than the image, with its faces mapped onto each copy
+        """
+        height, width = image.shape[:2]
+        tiers = []
+        for edge in sorted(set(settings.destination_tiers)):
+            if not 0 < edge < max(height, width):
+                continue
+            tier_image = resize_to_max_edge(image, edge)
+            scale_x = tier_image.shape[1] / width
+            scale_y = tier_image.shape[0] / height
+            tiers.append((edge, tier_image, _resized_faces(faces, scale_x, scale_y)))
+        return tiers
+
+    def _destination_tier(
+        self, filename: str, image: np.ndarray, faces: List[Face], max_edge: int
+    ) -> Tuple[np.ndarray, List[Face]]:
+        """
+        The smallest tier at least ``max_edge`` long, or the full-resolution
+        destination when no tier covers it (or ``max_edge`` is 0)
+        """
+        if max_edge > 0:
+            for edge, tier_image, tier_faces in self.destination_tiers.get(filename, ()):
+                if edge >= max_edge:
+                    return tier_image, tier_faces
+        return image, faces
+
+    def _destination_cache_for(self, path: Path) -> DestinationCache:
+        cache_dir = settings.destination_cache_dir or path.parent / ".swaparoony-cache"
+        model_name = face_analysis_pack(
+            settings.face_analysis_name, settings.model_precision
+        )
+        return DestinationCache(Path(cache_dir), model_name, settings.det_size)
+
+    def _load_cached_destination(self, path: Path):
+        """
+        Load a destination through the on-disk cache
+        Returns: ((image, sorted_faces) or None, whether the entry was rebuilt)
+        """
+        data = path.read_bytes()
+        digest = content_digest(data)
+        cache = self._destination_cache_for(path)
+
+        cached = cache.load(path.name, digest)
+        if cached is not None:
+            return cached, False
+
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        entry = self._load_destination(image)
+        if entry is not None:
+            cache.save(path.name, digest, *entry)
+        return entry, True
 
     def _ensure_initialized(self):
         if not self._initialized:
@@ -77,27 +295,70 @@ class FaceSwapService:
                 "Models not initialized. Call initialize_models() first."
             )
 
-    def _decode_image(self, image_data: bytes) -> np.ndarray:
+    def _decode_image(
+        self, image_data: bytes, flags: int = cv2.IMREAD_COLOR
+    ) -> np.ndarray:
         """Decode image from bytes to numpy array"""
         try:
             nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            with stage("decode"):
+                image = cv2.imdecode(nparr, flags)
             if image is None:
                 raise InvalidImageError("Could not decode image")
             return image
         except Exception as e:
             raise InvalidImageError(f"Invalid image format: {str(e)}")
 
-    def _encode_image(self, image: np.ndarray) -> str:
+    def _encode_image_bytes(
+        self, image: np.ndarray, output_format: Optional[OutputFormat] = None
+    ) -> bytes:
+        """Encode numpy array to image bytes (the configured format by default)"""
+        with stage("encode"):
+            return encode_image(image, output_format or resolve_output_format())
+
+    def _encode_image(
+        self, image: np.ndarray, output_format: Optional[OutputFormat] = None
+    ) -> str:
         """Encode numpy array to base64 string"""
-        _, buffer = cv2.imencode(".jpg", image)
-        return base64.b64encode(buffer).decode("utf-8")
+        encoded = self._encode_image_bytes(image, output_format)
+        with stage("base64"):
+            return base64.b64encode(encoded).decode("utf-8")
 
-    def _get_faces(self, image: np.ndarray) -> List:
-        """Get sorted faces from image"""
-        faces = self.app.get(image)
+    def _get_faces(self, image: np.ndarray) -> List[Face]:
+        """
+        Detect faces and sort them left to right. Faces carry bbox, kps and
+        det_score only; embeddings are computed on demand for the selected
+        source face (see ``_embed_face``).
+        """
+        with stage("detection"):
+            if self._detection_batcher is not None:
+                bboxes, kpss = self._detection_batcher.detect(image)
+            else:
+                bboxes, kpss = self.app.det_model.detect(
+                    image, max_num=0, metric="default"
+                )
+        faces = [
+            Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=bboxes[i, 4],
+            )
+            for i in range(bboxes.shape[0])
+        ]
         return sorted(faces, key=lambda x: x.bbox[0])
 
+    def _embed_face(self, image: np.ndarray, face: Face, scale: int = 1):
+        """
+        Compute the recognition embedding of one face, unless it has one.
+        ``scale`` maps ``image`` pixels to the face's coordinates.
+        """
+        if face.embedding is not None:
+            return
+        recognition = self.app.models["recognition"]
+        crop_face = face if scale == 1 else Face(kps=face.kps / scale)
+        with stage("recognition"):
+            face.embedding = recognition.get(image, crop_face)
+
     def _validate_face_index(self, faces: List, face_index: int, image_type: str):
         """Validate that face index exists in detected faces"""
         if not faces:
@@ -109,19 +370,96 @@ class FaceSwapService:
                 f"but requested face {face_index}"
             )
 
+    def _decode_for_detection(self, image_data: bytes) -> Tuple[np.ndarray, int]:
+        """
+        Decode an upload for face detection. Large JPEGs are decoded at 1/2,
+        1/4 or 1/8 scale, keeping the long edge at least det_size, since the
+        detector downsizes to det_size anyway.
+        Returns: (decoded_image, scale from decoded to full-resolution pixels)
+        """
+        factor = 1
+        if settings.reduced_decode:
+            factor = detection_reduction(image_data, settings.det_size)
+        if factor == 1:
+            return self._decode_image(image_data), 1
+        return self._decode_image(image_data, REDUCED_DECODE_FLAGS[factor]), factor
+
+    @staticmethod
+    def _scale_faces(faces: List[Face], scale: int):
+        """Map detections on a reduced decode back to full-resolution pixels"""
+        for face in faces:
+            face.bbox = face.bbox * scale
+            if face.kps is not None:
+                face.kps = face.kps * scale
+
+    def _embed_source_face(
+        self, source_image_data: bytes, image: np.ndarray, face: Face, scale: int
+    ):
+        """
+        Embed the selected source face. A face found on a reduced decode that
+        is smaller there than the recognition crop is embedded from the
+        full-resolution upload rather than from upsampled pixels.
+        """
+        if face.embedding is not None:
+            return
+        if scale > 1:
+            width = (face.bbox[2] - face.bbox[0]) / scale
+            if width < self.app.models["recognition"].input_size[0]:
+                image, scale = self._decode_image(source_image_data), 1
+        self._embed_face(image, face, scale)
+
+    def _analyze_source(
+        self, source_image_data: bytes, source_face_id: int
+    ) -> Tuple[np.ndarray, List[Face], Face]:
+        """
+        Decode the uploaded image and select the requested source face.
+        Analyses are cached by upload content, so a resubmitted photo skips
+        decoding and detection. Only the selected face is embedded. Large JPEGs are analysed on a reduced decode
+        (see ``_decode_for_detection``); face coordinates are always in
+        full-resolution pixels, but the returned image is the reduced one.
+        Returns: (decoded_image, sorted_faces, selected_face)
+        """
+        digest = content_digest(source_image_data)
+        cached = self.source_cache.get(digest)
+        if cached is None:
+            source_image, scale = self._decode_for_detection(source_image_data)
+            source_faces = self._get_faces(source_image)
+            if scale > 1:
+                self._scale_faces(source_faces, scale)
+            self.source_cache.put(digest, (source_image, source_faces, scale))
+        else:
+            source_image, source_faces, scale = cached
+
+        self._validate_face_index(source_faces, source_face_id, "source")
+        source_face = source_faces[source_face_id - 1]
+        self._embed_source_face(source_image_data, source_image, source_face, scale)
+        return source_image, source_faces, source_face
+
     def swap_face_on_image(
         self,
         source_image: np.ndarray,
         destination_image: np.ndarray,
         source_face_id: int = 1,
         dest_face_id: int = 1,
+        dest_faces: Optional[List] = None,
+        source_faces: Optional[List] = None,
+        roi_paste_back: Optional[bool] = None,
     ) -> np.ndarray:
-        """Swap face from source onto destination image"""
+        """Swap face from source onto destination image
+
+        Pass ``source_faces`` and ``dest_faces`` (sorted faces, e.g. from
+        ``_analyze_source`` or the destination index) to skip detection on
+        the corresponding image. ``roi_paste_back`` (default: the
+        ``roi_paste_back`` setting) blends only around the face instead of
+        over the whole destination as ``INSwapper.get`` does.
+        """
         self._ensure_initialized()
 
         # Get faces from both images
-        source_faces = self._get_faces(source_image)
-        dest_faces = self._get_faces(destination_image)
+        if source_faces is None:
+            source_faces = self._get_faces(source_image)
+        if dest_faces is None:
+            dest_faces = self._get_faces(destination_image)
 
         # Validate face indices
         self._validate_face_index(source_faces, source_face_id, "source")
@@ -130,45 +468,326 @@ class FaceSwapService:
         # Get specific faces
         source_face = source_faces[source_face_id - 1]
         dest_face = dest_faces[dest_face_id - 1]
+        self._embed_face(source_image, source_face)
 
         # Perform face swap
+        if roi_paste_back is None:
+            roi_paste_back = settings.roi_paste_back
+        if roi_paste_back:
+            ((target, swapped_crop),) = self._swap_batch(
+                source_face, [(destination_image, dest_face)]
+            )
+            with stage("paste_back"):
+                return swap_ops.paste_back_roi(target, swapped_crop)
+
         result = self.swapper.get(
             destination_image, dest_face, source_face, paste_back=True
         )
 
         return result
 
-    def process_face_swap_request(
-        self, source_image_data: bytes, source_face_id: int = 1, dest_face_id: int = 1
-    ) -> Tuple[List[Tuple[str, str]], int]:
+    def _swap_batch(
+        self, source_face: Face, targets: List[Tuple[np.ndarray, Face]]
+    ) -> List[Tuple[swap_ops.AlignedTarget, np.ndarray]]:
         """
-        Process face swap for all preloaded destination images
-        Returns: (list_of_(base64_image, filename)_tuples, faces_detected_in_source)
+        Swap one source face onto several (destination_image, dest_face)
+        targets with a single inswapper inference run.
+        Returns: (aligned_target, swapped_crop) pairs in the order of ``targets``
         """
-        self._ensure_initialized()
+        with stage("align"):
+            latent = swap_ops.source_latent(self.swapper, source_face)
+            aligned = [
+                swap_ops.align_target(self.swapper, image, face)
+                for image, face in targets
+            ]
+        with stage("swap_inference"):
+            fakes = swap_ops.swap_aligned(self.swapper, aligned, latent)
+        return list(zip(aligned, fakes))
+
+    def _paste_and_encode(
+        self,
+        target: swap_ops.AlignedTarget,
+        swapped_crop: np.ndarray,
+        output_format: Optional[OutputFormat] = None,
+        raw: bool = False,
+    ) -> Union[str, bytes]:
+        """Paste a swapped crop into its destination and encode the result"""
+        paste_back = (
+            swap_ops.paste_back_roi if settings.roi_paste_back else swap_ops.paste_back
+        )
+        with stage("paste_back"):
+            swapped = paste_back(target, swapped_crop)
+        if raw:
+            return self._encode_image_bytes(swapped, output_format)
+        return self._encode_image(swapped, output_format)
 
-        # Decode source image
-        source_image = self._decode_image(source_image_data)
+    def _fan_out(self, func: Callable, items: List[tuple]) -> Iterator[Tuple[int, object]]:
+        """
+        Apply func to each argument tuple across the destination pool
+        Yields: (item_index, result) as each call completes, with the
+        exception in place of the result for failed calls
+        """
+        if self._destination_executor is None or len(items) < 2:
+            for index, item in enumerate(items):
+                yield index, _capture(func, *item)
+            return
+
+        futures = {
+            self._destination_executor.submit(_capture, func, *item): index
+            for index, item in enumerate(items)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def resolve_destinations(
+        self, destinations: Optional[Sequence[Union[str, int]]]
+    ) -> Optional[Tuple[str, ...]]:
+        """
+        Gallery filenames selected by name or position (starting at 1), in
+        gallery order; None selects every destination
+        Raises: UnknownDestinationError for names or positions not in the gallery
+        """
+        if destinations is None:
+            return None
+        gallery = [filename for _, filename in self.destination_images]
+        selected = set()
+        for entry in destinations:
+            if isinstance(entry, int) or str(entry).strip().isdigit():
+                position = int(entry)
+                if not 1 <= position <= len(gallery):
+                    raise UnknownDestinationError(
+                        f"Destination position {position} is out of range "
+                        f"(1-{len(gallery)})"
+                    )
+                selected.add(gallery[position - 1])
+            elif entry in gallery:
+                selected.add(entry)
+            else:
+                raise UnknownDestinationError(f"Unknown destination {entry!r}")
+        if not selected:
+            raise UnknownDestinationError("No destinations selected")
+        return tuple(filename for filename in gallery if filename in selected)
+
+    def _selected_destinations(
+        self, names: Optional[Tuple[str, ...]]
+    ) -> List[Tuple[np.ndarray, str]]:
+        if names is None:
+            return self.destination_images
+        return [entry for entry in self.destination_images if entry[1] in names]
+
+    def _select_targets(
+        self, dest_face_id: int, max_edge: int = 0, names: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[DestinationResult], List[Tuple[str, np.ndarray, Face]]]:
+        """
+        Pick the requested face in every selected destination (all if
+        ``names`` is None), on the smallest resolution tier that covers
+        ``max_edge``
+        Returns: (failed results for destinations without that face,
+                  (filename, destination_image, dest_face) targets)
+        """
+        failures = []
+        targets = []
+        for dest_image, filename in self._selected_destinations(names):
+            dest_faces = self.destination_faces.get(filename)
+            if dest_faces is None:
+                dest_faces = self._get_faces(dest_image)
+            dest_image, dest_faces = self._destination_tier(
+                filename, dest_image, dest_faces, max_edge
+            )
+            try:
+                self._validate_face_index(dest_faces, dest_face_id, "destination")
+            except FaceSwapError as e:
+                failures.append(DestinationResult(filename, None, str(e)))
+                continue
+            targets.append((filename, dest_image, dest_faces[dest_face_id - 1]))
+        return failures, targets
 
-        # Get source faces for validation and count
-        source_faces = self._get_faces(source_image)
-        self._validate_face_index(source_faces, source_face_id, "source")
+    def _iter_results(
+        self,
+        source_face: Face,
+        dest_face_id: int,
+        output_format: Optional[OutputFormat],
+        raw: bool,
+        names: Optional[Tuple[str, ...]] = None,
+    ) -> Iterator[DestinationResult]:
+        output_format = output_format or resolve_output_format()
+        failures, targets = self._select_targets(
+            dest_face_id, output_format.max_edge, names
+        )
+        yield from failures
+        if not targets:
+            return
+
+        filenames = [filename for filename, _, _ in targets]
+        try:
+            swapped = self._swap_batch(
+                source_face, [(image, face) for _, image, face in targets]
+            )
+        except Exception as e:
+            for filename in filenames:
+                yield DestinationResult(filename, None, str(e))
+            return
 
+        finish = functools.partial(
+            self._paste_and_encode, output_format=output_format, raw=raw
+        )
+        for index, outcome in self._fan_out(finish, swapped):
+            if isinstance(outcome, Exception):
+                yield DestinationResult(filenames[index], None, str(outcome))
+            else:
+                yield DestinationResult(filenames[index], outcome)
+
+    def iter_destinations(
+        self,
+        source_image_data: bytes,
+        source_face_id: int = 1,
+        dest_face_id: int = 1,
+        raw: bool = False,
+        output_format: Optional[OutputFormat] = None,
+        destinations: Optional[Sequence[Union[str, int]]] = None,
+    ) -> Tuple[Iterator[DestinationResult], int]:
+        """
+        Swap the source face onto every preloaded destination image (or the
+        ``destinations`` selected by name or position), yielding each
+        DestinationResult as soon as that destination is finished.
+        The selection and the source are validated before this returns, so
+        those errors are raised here rather than part-way through the
+        iteration. Images are encoded with ``output_format`` (the configured
+        default if None) and returned as base64, or as bytes with ``raw``.
+        Returns: (iterator_of_results_in_completion_order, faces_detected_in_source)
+        """
+        self._ensure_initialized()
+        names = self.resolve_destinations(destinations)
+
+        # Decode and detect the source once for every destination
+        _, source_faces, source_face = self._analyze_source(
+            source_image_data, source_face_id
+        )
+        results = self._iter_results(
+            source_face, dest_face_id, output_format, raw, names
+        )
+        return count_destination_failures(results), len(source_faces)
+
+    def _cached_results(
+        self, request_key: tuple, names: Optional[Tuple[str, ...]] = None
+    ) -> Optional[Tuple[List[DestinationResult], int]]:
+        """Cached raw results for every selected destination, or None on any miss"""
+        selected = self._selected_destinations(names)
+        if not selected:
+            return None
         results = []
+        faces_detected = 0
+        for _, filename in selected:
+            entry = self.result_cache.get(request_key + (filename,))
+            if entry is None:
+                return None
+            result, faces_detected = entry
+            results.append(result)
+        return results, faces_detected
+
+    def _compute_results(
+        self,
+        request_key: tuple,
+        source_image_data: bytes,
+        names: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[DestinationResult], int]:
+        """Swap the selected destinations with raw output and cache each result"""
+        _, source_face_id, dest_face_id, output_format = request_key
+        stream, faces_detected = self.iter_destinations(
+            source_image_data, source_face_id, dest_face_id, True, output_format, names
+        )
+        gallery_order = {
+            filename: index
+            for index, (_, filename) in enumerate(self.destination_images)
+        }
+        results = sorted(stream, key=lambda r: gallery_order[r.destination_name])
+        for result in results:
+            self.result_cache.put(
+                request_key + (result.destination_name,), (result, faces_detected)
+            )
+        return results, faces_detected
 
-        for dest_image, filename in self.destination_images:
-            try:
-                # Perform face swap on preloaded image
-                swapped = self.swap_face_on_image(
-                    source_image, dest_image, source_face_id, dest_face_id
-                )
+    def swap_destinations(
+        self,
+        source_image_data: bytes,
+        source_face_id: int = 1,
+        dest_face_id: int = 1,
+        raw: bool = False,
+        output_format: Optional[OutputFormat] = None,
+        destinations: Optional[Sequence[Union[str, int]]] = None,
+    ) -> Tuple[List[DestinationResult], int]:
+        """
+        Swap the source face onto every preloaded destination image, or only
+        onto the ``destinations`` selected by name or position (starting at 1).
+        Results are served from the result cache when every selected
+        destination is cached; otherwise concurrent identical requests are
+        coalesced so the swap runs once and they all share its results.
+        Returns: (one DestinationResult per selected destination in gallery
+                  order, faces_detected_in_source)
+        """
+        self._ensure_initialized()
+        names = self.resolve_destinations(destinations)
+
+        output_format = output_format or resolve_output_format()
+        request_key = (
+            content_digest(source_image_data),
+            source_face_id,
+            dest_face_id,
+            output_format,
+        )
+        cached = self._cached_results(request_key, names)
+        if cached is None:
+            cached = self._inflight_swaps.do(
+                request_key + (names,),
+                self._compute_results,
+                request_key,
+                source_image_data,
+                names,
+            )
+        results, faces_detected = cached
+
+        if not raw:
+            with stage("base64"):
+                results = [
+                    result._replace(
+                        image_data=base64.b64encode(result.image_data).decode("utf-8")
+                    )
+                    if result.image_data is not None
+                    else result
+                    for result in results
+                ]
+        return results, faces_detected
 
-                # Encode to base64
-                encoded = self._encode_image(swapped)
-                results.append((encoded, filename))
+    def process_face_swap_request(
+        self,
+        source_image_data: bytes,
+        source_face_id: int = 1,
+        dest_face_id: int = 1,
+        output_format: Optional[OutputFormat] = None,
+        destinations: Optional[Sequence[Union[str, int]]] = None,
+    ) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        Process face swap for all preloaded destination images, or only the
+        selected ``destinations``
+        Returns: (list_of_(base64_image, filename)_tuples, faces_detected_in_source)
+        """
+        destination_results, faces_detected = self.swap_destinations(
+            source_image_data,
+            source_face_id,
+            dest_face_id,
+            output_format=output_format,
+            destinations=destinations,
+        )
 
-            except Exception:
+        results = []
+        for result in destination_results:
+            if result.error is not None:
                 # Skip this destination if swap fails
+                print(
+                    f"Warning: Face swap failed for {result.destination_name}: "
+                    f"{result.error}"
+                )
                 continue
+            results.append((result.image_data, result.destination_name))
 
-        return results, len(source_faces)
+        return results, faces_detected
@@ -4,13 +4,18 @@ import kserve
 from kserve import ModelServer
 import base64
 from .face_swap_service import FaceSwapService
+from .profiling import profiling_allowed, run_profiled
 from ..core.exceptions import (
     ModelLoadError,
     NoFaceDetectedError,
     InsufficientFacesError,
     InvalidImageError,
+    InvalidOutputFormatError,
     FaceSwapError,
 )
+from ..core.config import settings
+from ..utils.encoding import resolve_output_format
+from ..utils.metrics import IN_FLIGHT, enable_stage_metrics, record_request
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +40,9 @@ class KServeFaceSwapModel(kserve.Model):
         logger.info("load() method called - loading face swap models")
 
         try:
+            if settings.metrics_enabled:
+                enable_stage_metrics()
+
             # Initialize the actual FaceSwapService
             logger.info("Initializing FaceSwapService...")
             self.face_swap_service = FaceSwapService()
@@ -59,8 +67,14 @@ class KServeFaceSwapModel(kserve.Model):
     ) -> Dict[str, Any]:
         """Main prediction method - perform face swap"""
         logger.info("predict() method called")
+        with IN_FLIGHT.track_inprogress():
+            return self._predict(request, headers or {})
 
+    def _predict(
+        self, request: Dict[str, Any], headers: Dict[str, str]
+    ) -> Dict[str, Any]:
         if not self.ready:
+            record_request("predict", ModelLoadError("models not loaded"))
             return {
                 "success": False,
                 "error": "Model not ready",
@@ -74,6 +88,7 @@ class KServeFaceSwapModel(kserve.Model):
             dest_face_id = request.get("destination_face_id", 1)
 
             if not image_b64:
+                record_request("predict", InvalidImageError("missing image"))
                 return {
                     "success": False,
                     "error": "Missing required parameter: image",
@@ -84,18 +99,48 @@ class KServeFaceSwapModel(kserve.Model):
             try:
                 image_bytes = base64.b64decode(image_b64)
             except Exception as e:
+                record_request("predict", InvalidImageError(str(e)))
                 return {
                     "success": False,
                     "error": "Invalid image data",
                     "detail": f"Could not decode base64 image: {str(e)}",
                 }
 
+            # Optional output encoding overrides
+            output_format = resolve_output_format(
+                request.get("output_format"),
+                request.get("output_quality"),
+                request.get("output_chroma_subsampling"),
+                request.get("output_max_edge"),
+            )
+
+            # Opt-in profiling, gated by the admin token
+            profile_token = {k.lower(): v for k, v in headers.items()}.get(
+                "x-profile-token"
+            )
+            if profile_token is not None and not profiling_allowed(profile_token):
+                return {
+                    "success": False,
+                    "error": "Forbidden",
+                    "detail": "Invalid profiling token",
+                }
+
             # Process face swap using existing service
-            results, faces_detected = self.face_swap_service.process_face_swap_request(
+            swap_args = dict(
                 source_image_data=image_bytes,
                 source_face_id=source_face_id,
                 dest_face_id=dest_face_id,
+                output_format=output_format,
             )
+            profile_id = None
+            if profile_token is not None:
+                (results, faces_detected), profile_id = run_profiled(
+                    self.face_swap_service, "process_face_swap_request", **swap_args
+                )
+            else:
+                results, faces_detected = (
+                    self.face_swap_service.process_face_swap_request(**swap_args)
+                )
 
             # Format response to match FastAPI schema
             swapped_images = [
@@ -109,23 +154,35 @@ class KServeFaceSwapModel(kserve.Model):
                 "swapped_images": swapped_images,
                 "faces_detected_in_source": faces_detected,
             }
+            if profile_id is not None:
+                response["profile_id"] = profile_id
 
             logger.info(f"Face swap completed: {len(swapped_images)} images processed")
+            record_request("predict")
             return response
 
         except NoFaceDetectedError as e:
+            record_request("predict", e)
             logger.warning(f"No face detected: {e}")
             return {"success": False, "error": "No face detected", "detail": str(e)}
         except InsufficientFacesError as e:
+            record_request("predict", e)
             logger.warning(f"Insufficient faces: {e}")
             return {"success": False, "error": "Insufficient faces", "detail": str(e)}
         except InvalidImageError as e:
+            record_request("predict", e)
             logger.warning(f"Invalid image: {e}")
             return {"success": False, "error": "Invalid image", "detail": str(e)}
+        except InvalidOutputFormatError as e:
+            record_request("predict", e)
+            logger.warning(f"Invalid output format: {e}")
+            return {"success": False, "error": "Invalid output format", "detail": str(e)}
         except FaceSwapError as e:
+            record_request("predict", e)
             logger.error(f"Face swap error: {e}")
             return {"success": False, "error": "Face swap failed", "detail": str(e)}
         except Exception as e:
+            record_request("predict", e)
             logger.error(f"Unexpected error: {e}")
             return {
                 "success": False,
@@ -0,0 +1,126 @@
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+from ..core.exceptions import ModelLoadError
+
+# Precision tiers, FP32 being the original models
+PRECISIONS = ("fp32", "fp16", "int8")
+
+# Face analysis tasks converted in a reduced precision pack; the others
+# (recognition only runs once per request) are copied unchanged
+CONVERTED_TASKS = ("detection",)
+
+
+def validate_precision(precision: str) -> str:
+    precision = precision.lower()
+    if precision not in PRECISIONS:
+        raise ModelLoadError(
+            f"Unsupported model precision {precision!r}. Allowed: {', '.join(PRECISIONS)}"
+        )
+    return precision
+
+
+def variant_path(model_path: str, precision: str) -> str:
+    """Swapper model file for a precision tier: models/x.onnx -> models/x.int8.onnx"""
+    precision = validate_precision(precision)
+    if precision == "fp32":
+        return model_path
+    path = Path(model_path)
+    return str(path.with_name(f"{path.stem}.{precision}{path.suffix}"))
+
+
+def face_analysis_pack(name: str, precision: str) -> str:
+    """
+    insightface model pack for a precision tier: buffalo_l -> buffalo_l_int8.
+    Variants get their own pack directory because FaceAnalysis loads every
+    .onnx file in a pack and keeps the first model found per task.
+    """
+    precision = validate_precision(precision)
+    return name if precision == "fp32" else f"{name}_{precision}"
+
+
+def quantize_int8(src: Path, dst: Path):
+    """Dynamic INT8 quantization (weights int8, activations quantized at run time)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(src), str(dst), weight_type=QuantType.QInt8)
+
+
+def convert_fp16(src: Path, dst: Path):
+    """FP16 weights and activations, keeping float32 inputs and outputs"""
+    import onnx
+
+    try:
+        from onnxconverter_common import float16
+    except ImportError:
+        raise ModelLoadError("FP16 conversion requires the onnxconverter-common package")
+
+    model = float16.convert_float_to_float16(onnx.load(str(src)), keep_io_types=True)
+    onnx.save(model, str(dst))
+
+
+CONVERTERS: Dict[str, Callable[[Path, Path], None]] = {
+    "int8": quantize_int8,
+    "fp16": convert_fp16,
+}
+
+
+def _restore_emap(src: Path, dst: Path):
+    """
+    INSwapper reads its embedding map from the model's last initializer.
+    Conversion may drop, reorder or cast it, so put the FP32 original back
+    at the end.
+    """
+    import onnx
+
+    emap = onnx.load(str(src)).graph.initializer[-1]
+    model = onnx.load(str(dst))
+    initializers = model.graph.initializer
+    for index in reversed(range(len(initializers))):
+        if initializers[index].name == emap.name:
+            del initializers[index]
+    initializers.append(emap)
+    onnx.save(model, str(dst))
+
+
+def _converter(precision: str) -> Callable[[Path, Path], None]:
+    precision = validate_precision(precision)
+    if precision not in CONVERTERS:
+        raise ModelLoadError(f"{precision} is the original precision, nothing to build")
+    return CONVERTERS[precision]
+
+
+def build_swapper_variant(model_path: str, precision: str) -> str:
+    """Write the swapper variant next to the FP32 model; returns its path"""
+    dst = variant_path(model_path, precision)
+    _converter(precision)(Path(model_path), Path(dst))
+    _restore_emap(Path(model_path), Path(dst))
+    return dst
+
+
+def build_face_analysis_variant(
+    models_root: Path, name: str, precision: str, tasks: Optional[Sequence[str]] = None
+) -> Path:
+    """
+    Create ``<models_root>/<name>_<precision>`` from the FP32 pack: models of
+    the converted tasks are converted, the rest are copied
+    """
+    import insightface
+
+    convert = _converter(precision)
+    tasks = CONVERTED_TASKS if tasks is None else tasks
+    src_dir = Path(models_root) / name
+    dst_dir = Path(models_root) / face_analysis_pack(name, precision)
+    if not src_dir.is_dir():
+        raise ModelLoadError(f"Face analysis pack not found: {src_dir}")
+    dst_dir.mkdir(parents=True, exist_ok=True)
+
+    for src in sorted(src_dir.glob("*.onnx")):
+        dst = dst_dir / src.name
+        model = insightface.model_zoo.get_model(str(src))
+        if model is not None and model.taskname in tasks:
+            convert(src, dst)
+        else:
+            shutil.copyfile(src, dst)
+    return dst_dir
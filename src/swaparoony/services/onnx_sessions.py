@@ -0,0 +1,97 @@
+from typing import Any, Dict, List
+
+import onnxruntime
+
+from ..core.config import settings
+from ..core.exceptions import ModelLoadError
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": onnxruntime.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def _lookup(table: dict, value: str, setting: str):
+    try:
+        return table[value.lower()]
+    except KeyError:
+        raise ModelLoadError(
+            f"Invalid {setting} {value!r}. Allowed: {', '.join(table)}"
+        )
+
+
+def build_session_options() -> onnxruntime.SessionOptions:
+    """SessionOptions from the ORT_* settings"""
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = settings.ort_intra_op_threads
+    options.inter_op_num_threads = settings.ort_inter_op_threads
+    options.graph_optimization_level = _lookup(
+        GRAPH_OPTIMIZATION_LEVELS, settings.ort_graph_optimization, "ort_graph_optimization"
+    )
+    options.execution_mode = _lookup(
+        EXECUTION_MODES, settings.ort_execution_mode, "ort_execution_mode"
+    )
+    options.enable_cpu_mem_arena = settings.ort_enable_mem_arena
+    options.enable_mem_pattern = settings.ort_enable_mem_pattern
+    return options
+
+
+def session_providers() -> List[str]:
+    """
+    Execution providers in priority order: ORT_PROVIDERS if set, otherwise
+    every available provider. Unavailable providers are skipped, and
+    ctx_id < 0 forces CPU as FaceAnalysis.prepare does.
+    """
+    available = onnxruntime.get_available_providers()
+    if settings.ctx_id < 0:
+        return ["CPUExecutionProvider"]
+    if not settings.ort_providers:
+        return available
+
+    providers = []
+    for provider in settings.ort_providers:
+        if provider in available:
+            providers.append(provider)
+        else:
+            print(f"Warning: ONNX Runtime provider {provider} is not available")
+    if not providers:
+        raise ModelLoadError(
+            f"None of the configured providers {settings.ort_providers} "
+            f"are available (available: {available})"
+        )
+    return providers
+
+
+def apply_session_config(models: List[Any]):
+    """
+    Recreate the ONNX session of each insightface model (detector,
+    recognizer, inswapper) with the configured options and providers.
+    insightface only forwards providers to its sessions, so this is the one
+    place thread counts and the other options take effect.
+    """
+    options = build_session_options()
+    providers = session_providers()
+    for model in models:
+        model.session = onnxruntime.InferenceSession(
+            model.model_file, sess_options=options, providers=providers
+        )
+
+
+def describe_session_config() -> Dict[str, Any]:
+    """Configured session settings, for reporting on /health"""
+    return {
+        "providers": settings.ort_providers,
+        "intra_op_threads": settings.ort_intra_op_threads,
+        "inter_op_threads": settings.ort_inter_op_threads,
+        "graph_optimization": settings.ort_graph_optimization,
+        "execution_mode": settings.ort_execution_mode,
+        "enable_mem_arena": settings.ort_enable_mem_arena,
+        "enable_mem_pattern": settings.ort_enable_mem_pattern,
+    }
@@ -0,0 +1,117 @@
+import copy
+import cProfile
+import hmac
+import io
+import pstats
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import onnxruntime
+
+from .onnx_sessions import build_session_options
+from ..core.config import settings
+from ..utils.cache import ByteBudgetLRU
+
+PYTHON_PROFILE = "python.prof"
+PYTHON_SUMMARY = "python.txt"
+
+
+def profiling_allowed(token: Optional[str]) -> bool:
+    """True if profiling is enabled and ``token`` is the admin token"""
+    if not settings.profiling_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.profiling_token.encode())
+
+
+def profile_path(profile_id: str) -> Path:
+    """Directory holding one stored profile; ids are uuid4 hex strings"""
+    if len(profile_id) != 32 or not all(c in "0123456789abcdef" for c in profile_id):
+        raise FileNotFoundError(profile_id)
+    return Path(settings.profile_dir) / profile_id
+
+
+def _profiling_session(model: Any, prefix: Path) -> onnxruntime.InferenceSession:
+    options = build_session_options()
+    options.enable_profiling = True
+    options.profile_file_prefix = str(prefix)
+    return onnxruntime.InferenceSession(
+        model.model_file,
+        sess_options=options,
+        providers=model.session.get_providers(),
+    )
+
+
+def _profiling_clone(service, output_dir: Path) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """
+    Shallow copy of the service whose detector and swapper run on their own
+    profiling-enabled ONNX sessions. ORT can only profile a session from its
+    creation, so the shared sessions are left alone. The copy works on one
+    thread and skips the caches and detection batcher so every stage of the
+    request runs and shows up in the profile.
+    Returns: (service copy, [(name, profiled model)])
+    """
+    clone = copy.copy(service)
+    clone._detection_batcher = None
+    clone._destination_executor = None
+    clone.source_cache = ByteBudgetLRU(0)
+    clone.result_cache = ByteBudgetLRU(0)
+
+    profiled = []
+    det_model = service.app.det_model
+    if hasattr(det_model, "session"):
+        det_model = copy.copy(det_model)
+        det_model.session = _profiling_session(det_model, output_dir / "detector")
+        profiled.append(("detector", det_model))
+    models = dict(service.app.models)
+    models["detection"] = det_model
+    clone.app = copy.copy(service.app)
+    clone.app.det_model = det_model
+    clone.app.models = models
+
+    clone.swapper = copy.copy(service.swapper)
+    clone.swapper.session = _profiling_session(clone.swapper, output_dir / "swapper")
+    profiled.append(("swapper", clone.swapper))
+    return clone, profiled
+
+
+def run_profiled(service, method: str, *args, **kwargs) -> Tuple[Any, str]:
+    """
+    Run ``service.<method>(*args, **kwargs)`` under cProfile with ONNX Runtime
+    profiling of the detector and swapper. The Python profile, a text summary
+    and the ORT traces (chrome://tracing JSON) are stored in
+    ``<profile_dir>/<profile_id>``.
+    Returns: (method result, profile_id)
+    """
+    profile_id = uuid.uuid4().hex
+    output_dir = Path(settings.profile_dir) / profile_id
+    output_dir.mkdir(parents=True)
+    clone, profiled = _profiling_clone(service, output_dir)
+
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(getattr(clone, method), *args, **kwargs)
+    finally:
+        profiler.dump_stats(str(output_dir / PYTHON_PROFILE))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(50)
+        (output_dir / PYTHON_SUMMARY).write_text(summary.getvalue())
+        for name, model in profiled:
+            trace = Path(model.session.end_profiling())
+            shutil.move(str(trace), str(output_dir / f"{name}_ort.json"))
+    print(f"Profiled {method} as {profile_id}")
+    return result, profile_id
+
+
+def zip_profile(profile_id: str) -> bytes:
+    """All files of a stored profile as a zip archive"""
+    directory = profile_path(profile_id)
+    if not directory.is_dir():
+        raise FileNotFoundError(profile_id)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(directory.iterdir()):
+            archive.write(path, path.name)
+    return buffer.getvalue()
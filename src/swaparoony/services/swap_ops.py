@@ -0,0 +1,183 @@
+"""
+Batched building blocks for the inswapper model.
+
+``INSwapper.get`` aligns, runs and pastes back one face per ONNX Runtime
+call. These helpers split that into stages so a request can align every
+destination face, run the swapper once on the stacked crops and paste each
+result back separately. The output matches ``INSwapper.get``;
+``paste_back_roi`` gets the same result while only touching the face region.
+"""
+
+from typing import List, NamedTuple, Tuple
+
+import cv2
+import numpy as np
+from insightface.utils import face_align
+
+
+class AlignedTarget(NamedTuple):
+    image: np.ndarray  # Full destination image
+    crop: np.ndarray  # Face crop aligned to the swapper's input size
+    matrix: np.ndarray  # Affine transform from image to crop
+
+
+def source_latent(swapper, source_face) -> np.ndarray:
+    """Project the source face embedding into the swapper's latent space"""
+    latent = source_face.normed_embedding.reshape((1, -1))
+    latent = np.dot(latent, swapper.emap)
+    latent /= np.linalg.norm(latent)
+    return latent.astype(np.float32)
+
+
+def align_target(swapper, image: np.ndarray, target_face) -> AlignedTarget:
+    """Crop and align a destination face for the swapper"""
+    crop, matrix = face_align.norm_crop2(image, target_face.kps, swapper.input_size[0])
+    return AlignedTarget(image, crop, matrix)
+
+
+def supports_batching(swapper) -> bool:
+    """True unless the model pins the batch dimension of an input to 1"""
+    return all(inp.shape[0] != 1 for inp in swapper.session.get_inputs())
+
+
+def swap_aligned(
+    swapper, targets: List[AlignedTarget], latent: np.ndarray
+) -> List[np.ndarray]:
+    """
+    Run the swapper on all aligned crops with one shared source latent
+    Returns: swapped BGR crops, in the order of ``targets``
+    """
+    if not targets:
+        return []
+
+    mean = swapper.input_mean
+    blob = cv2.dnn.blobFromImages(
+        [target.crop for target in targets],
+        1.0 / swapper.input_std,
+        swapper.input_size,
+        (mean, mean, mean),
+        swapRB=True,
+    )
+
+    if supports_batching(swapper):
+        latents = np.repeat(latent, len(targets), axis=0)
+        pred = _run(swapper, blob, latents)
+    else:
+        pred = np.concatenate(
+            [_run(swapper, blob[i : i + 1], latent) for i in range(len(targets))]
+        )
+
+    fakes = np.clip(255 * pred.transpose((0, 2, 3, 1)), 0, 255).astype(np.uint8)
+    return [np.ascontiguousarray(fake[:, :, ::-1]) for fake in fakes]
+
+
+def _run(swapper, blob: np.ndarray, latent: np.ndarray) -> np.ndarray:
+    return swapper.session.run(
+        swapper.output_names,
+        {swapper.input_names[0]: blob, swapper.input_names[1]: latent},
+    )[0]
+
+
+def paste_back(target: AlignedTarget, bgr_fake: np.ndarray) -> np.ndarray:
+    """Blend a swapped crop back into a copy of its destination image"""
+    target_img = target.image
+    aimg = target.crop
+    size = (target_img.shape[1], target_img.shape[0])
+
+    # INSwapper.get also builds a warped "fake_diff" mask that it never
+    # uses in the blend; it is left out here.
+    IM = cv2.invertAffineTransform(target.matrix)
+    img_white = np.full((aimg.shape[0], aimg.shape[1]), 255, dtype=np.float32)
+    bgr_fake = cv2.warpAffine(bgr_fake, IM, size, borderValue=0.0)
+    img_white = cv2.warpAffine(img_white, IM, size, borderValue=0.0)
+    img_white[img_white > 20] = 255
+
+    img_mask = img_white
+    mask_h_inds, mask_w_inds = np.where(img_mask == 255)
+    mask_h = np.max(mask_h_inds) - np.min(mask_h_inds)
+    mask_w = np.max(mask_w_inds) - np.min(mask_w_inds)
+    mask_size = int(np.sqrt(mask_h * mask_w))
+
+    k = max(mask_size // 10, 10)
+    img_mask = cv2.erode(img_mask, np.ones((k, k), np.uint8), iterations=1)
+    k = max(mask_size // 20, 5)
+    img_mask = cv2.GaussianBlur(img_mask, (2 * k + 1, 2 * k + 1), 0)
+    img_mask /= 255
+    img_mask = np.reshape(img_mask, [img_mask.shape[0], img_mask.shape[1], 1])
+
+    fake_merged = img_mask * bgr_fake + (1 - img_mask) * target_img.astype(np.float32)
+    return fake_merged.astype(np.uint8)
+
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 (exclusive)
+
+
+def _warp_bounds(matrix: np.ndarray, crop_size: Tuple[int, int]) -> Box:
+    """Bounding box of the crop warped back by ``matrix``"""
+    w, h = crop_size
+    corners = np.array([[0, 0, 1], [w, 0, 1], [0, h, 1], [w, h, 1]], dtype=np.float64)
+    points = corners @ matrix.T
+    x0, y0 = np.floor(points.min(axis=0)).astype(int)
+    x1, y1 = np.ceil(points.max(axis=0)).astype(int) + 1
+    return x0, y0, x1, y1
+
+
+def _clip_roi(bounds: Box, margin: int, width: int, height: int) -> Box:
+    x0, y0, x1, y1 = bounds
+    return (
+        max(x0 - margin, 0),
+        max(y0 - margin, 0),
+        min(x1 + margin, width),
+        min(y1 + margin, height),
+    )
+
+
+def _warp_roi(image: np.ndarray, IM: np.ndarray, roi: Box) -> np.ndarray:
+    """Warp into the ``roi`` window of the destination frame only"""
+    x0, y0, x1, y1 = roi
+    shifted = IM.copy()
+    shifted[:, 2] -= (x0, y0)
+    return cv2.warpAffine(image, shifted, (x1 - x0, y1 - y0), borderValue=0.0)
+
+
+def paste_back_roi(target: AlignedTarget, bgr_fake: np.ndarray) -> np.ndarray:
+    """
+    ``paste_back`` restricted to the face's region: the warp, mask erosion,
+    blur and blend run on the warped crop's bounding box plus the erosion
+    and blur margins, then the blend is written into a copy of the
+    destination. Cost scales with the face size instead of the image size.
+    """
+    target_img = target.image
+    height, width = target_img.shape[:2]
+    aimg = target.crop
+    IM = cv2.invertAffineTransform(target.matrix)
+    bounds = _warp_bounds(IM, (aimg.shape[1], aimg.shape[0]))
+    white = np.full((aimg.shape[0], aimg.shape[1]), 255, dtype=np.float32)
+
+    # Mask size (and so kernel sizes) from the warped mask's extent
+    mask = _warp_roi(white, IM, _clip_roi(bounds, 1, width, height))
+    mask_h_inds, mask_w_inds = np.where(mask > 20)
+    if len(mask_h_inds) == 0:
+        return target_img.copy()
+    mask_h = np.max(mask_h_inds) - np.min(mask_h_inds)
+    mask_w = np.max(mask_w_inds) - np.min(mask_w_inds)
+    mask_size = int(np.sqrt(mask_h * mask_w))
+    erode_k = max(mask_size // 10, 10)
+    blur_k = max(mask_size // 20, 5)
+
+    # Enough zero border that erosion and blur see what the full frame has
+    roi = _clip_roi(bounds, erode_k + 2 * blur_k + 2, width, height)
+    x0, y0, x1, y1 = roi
+    img_mask = _warp_roi(white, IM, roi)
+    img_mask[img_mask > 20] = 255
+    fake = _warp_roi(bgr_fake, IM, roi)
+
+    img_mask = cv2.erode(img_mask, np.ones((erode_k, erode_k), np.uint8), iterations=1)
+    img_mask = cv2.GaussianBlur(img_mask, (2 * blur_k + 1, 2 * blur_k + 1), 0)
+    img_mask /= 255
+    img_mask = img_mask[:, :, np.newaxis]
+
+    region = target_img[y0:y1, x0:x1].astype(np.float32)
+    result = target_img.copy()
+    result[y0:y1, x0:x1] = (img_mask * fake + (1 - img_mask) * region).astype(np.uint8)
+    return result
@@ -0,0 +1,107 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..core.config import settings
+from ..core.exceptions import InvalidOutputFormatError
+
+# codec -> (cv2 extension, media type, quality flag)
+CODECS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", "image/png", None),
+}
+
+CHROMA_SUBSAMPLING = {
+    "420": "IMWRITE_JPEG_SAMPLING_FACTOR_420",
+    "422": "IMWRITE_JPEG_SAMPLING_FACTOR_422",
+    "444": "IMWRITE_JPEG_SAMPLING_FACTOR_444",
+}
+
+
+class OutputFormat(NamedTuple):
+    codec: str
+    extension: str
+    media_type: str
+    params: Tuple[int, ...]  # cv2.imencode parameters, built once per format
+    max_edge: int  # Longest output edge in pixels, 0 keeps full resolution
+
+
+@lru_cache(maxsize=64)
+def get_output_format(
+    codec: str = "jpeg",
+    quality: Optional[int] = None,
+    chroma_subsampling: Optional[str] = None,
+    max_edge: int = 0,
+) -> OutputFormat:
+    """Validate an output format and build its encoder parameters"""
+    codec = codec.lower()
+    if codec == "jpg":
+        codec = "jpeg"
+    if codec not in CODECS:
+        raise InvalidOutputFormatError(
+            f"Unsupported output format {codec!r}. Allowed: {', '.join(CODECS)}"
+        )
+    extension, media_type, quality_flag = CODECS[codec]
+
+    params = []
+    if quality is not None:
+        if not 1 <= quality <= 100:
+            raise InvalidOutputFormatError("Output quality must be between 1 and 100")
+        if quality_flag is not None:
+            params += [quality_flag, quality]
+
+    if chroma_subsampling is not None:
+        if codec != "jpeg":
+            raise InvalidOutputFormatError("Chroma subsampling only applies to JPEG")
+        factor = getattr(cv2, CHROMA_SUBSAMPLING.get(chroma_subsampling, ""), None)
+        if factor is None:
+            raise InvalidOutputFormatError(
+                f"Unsupported chroma subsampling {chroma_subsampling!r}. "
+                f"Allowed: {', '.join(CHROMA_SUBSAMPLING)}"
+            )
+        params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+
+    if max_edge < 0:
+        raise InvalidOutputFormatError("Output max edge cannot be negative")
+
+    return OutputFormat(codec, extension, media_type, tuple(params), max_edge)
+
+
+def resolve_output_format(
+    codec: Optional[str] = None,
+    quality: Optional[int] = None,
+    chroma_subsampling: Optional[str] = None,
+    max_edge: Optional[int] = None,
+) -> OutputFormat:
+    """Build an output format from per-request values, defaulting to settings"""
+    return get_output_format(
+        codec if codec is not None else settings.output_format,
+        quality if quality is not None else settings.output_quality,
+        (
+            chroma_subsampling
+            if chroma_subsampling is not None
+            else settings.output_chroma_subsampling
+        ),
+        max_edge if max_edge is not None else settings.output_max_edge,
+    )
+
+
+def resize_to_max_edge(image: np.ndarray, max_edge: int) -> np.ndarray:
+    """Downscale so the longest edge is at most max_edge (0 disables)"""
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if max_edge <= 0 or longest <= max_edge:
+        return image
+    scale = max_edge / longest
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_image(image: np.ndarray, output_format: OutputFormat) -> bytes:
+    """Resize to the format's max edge, then encode"""
+    image = resize_to_max_edge(image, output_format.max_edge)
+    _, buffer = cv2.imencode(output_format.extension, image, output_format.params)
+    return buffer.tobytes()
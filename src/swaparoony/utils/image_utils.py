@@ -1,5 +1,7 @@
+import cv2
 from fastapi import UploadFile
 from pathlib import Path
+from typing import Optional, Tuple
 from ..core.config import settings
 from ..core.exceptions import InvalidImageError
 
@@ -21,3 +23,56 @@ async def validate_image_file(file: UploadFile) -> bytes:
         )
 
     return contents
+
+
+# Reduced decode flags by scale factor; libjpeg scales these in the DCT, so
+# they are much cheaper than a full decode for JPEGs
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Start-of-frame markers (baseline, progressive, lossless...), excluding
+# DHT (C4), JPG (C8) and DAC (CC) which share the range
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG frame header, None if not a readable JPEG"""
+    if not data.startswith(b"\xff\xd8"):
+        return None
+
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Markers without length
+            offset += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+            width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+            return width, height
+        offset += 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
+    return None
+
+
+def detection_reduction(data: bytes, det_size: tuple) -> int:
+    """
+    Largest JPEG decode reduction (1, 2, 4 or 8) that keeps the long edge at
+    or above the detector input size, since detection resizes to det_size
+    anyway. Non-JPEG uploads always decode at full size.
+    """
+    dimensions = jpeg_dimensions(data)
+    if dimensions is None:
+        return 1
+    longest, target = max(dimensions), max(det_size)
+    for factor in (8, 4, 2):
+        if longest // factor >= target:
+            return factor
+    return 1
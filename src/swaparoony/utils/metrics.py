@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from ..core.exceptions import FaceSwapError
+from .timing import add_stage_observer, remove_stage_observer
+
+# Everything is registered on the default registry, which KServe's model
+# server already serves on its own /metrics route
+
+REQUESTS = Counter(
+    "swaparoony_requests",
+    "Face swap requests by endpoint and outcome (success or exception type)",
+    ["endpoint", "outcome"],
+)
+IN_FLIGHT = Gauge(
+    "swaparoony_in_flight_requests", "Requests currently holding an inference slot"
+)
+QUEUED = Gauge(
+    "swaparoony_queued_requests", "Requests waiting for an inference slot"
+)
+STAGE_SECONDS = Histogram(
+    "swaparoony_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DESTINATION_FAILURES = Counter(
+    "swaparoony_destination_failures",
+    "Destinations that could not be swapped",
+    ["destination"],
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Labelled children, looked up once per stage instead of on every observation
+_stage_histograms: Dict[str, Histogram] = {}
+
+
+def observe_stage(name: str, seconds: float):
+    histogram = _stage_histograms.get(name)
+    if histogram is None:
+        histogram = _stage_histograms.setdefault(name, STAGE_SECONDS.labels(name))
+    histogram.observe(seconds)
+
+
+def enable_stage_metrics():
+    """Feed stage timings into the histogram (idempotent)"""
+    remove_stage_observer(observe_stage)
+    add_stage_observer(observe_stage)
+
+
+def disable_stage_metrics():
+    remove_stage_observer(observe_stage)
+
+
+def outcome_of(error: Optional[BaseException]) -> str:
+    """Request outcome label; unexpected errors share one label"""
+    if error is None:
+        return "success"
+    if isinstance(error, FaceSwapError):
+        return type(error).__name__
+    return "UnexpectedError"
+
+
+def record_request(endpoint: str, error: Optional[BaseException] = None):
+    REQUESTS.labels(endpoint, outcome_of(error)).inc()
+
+
+def track_limiter(limiter):
+    """Report an InferenceLimiter's queue depth and in-flight count at scrape time"""
+    IN_FLIGHT.set_function(lambda: limiter.in_flight)
+    QUEUED.set_function(lambda: limiter.queued)
+
+
+def count_destination_failures(results: Iterable) -> Iterator:
+    """Pass DestinationResults through, counting the failed ones"""
+    for result in results:
+        if result.error is not None:
+            DESTINATION_FAILURES.labels(result.destination_name).inc()
+        yield result
+
+
+class CacheCollector:
+    """
+    Exposes hit/miss/eviction counters and sizes of ByteBudgetLRU caches.
+    Values are read from the caches' own counters when scraped, so the
+    request path pays nothing extra.
+    """
+
+    def __init__(self):
+        self.caches: Dict[str, object] = {}
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "swaparoony_cache_hits", "Cache lookups that hit", labels=["cache"]
+        )
+        misses = CounterMetricFamily(
+            "swaparoony_cache_misses", "Cache lookups that missed", labels=["cache"]
+        )
+        evictions = CounterMetricFamily(
+            "swaparoony_cache_evictions", "Entries evicted to fit the budget", labels=["cache"]
+        )
+        size = GaugeMetricFamily(
+            "swaparoony_cache_bytes", "Bytes held by the cache", labels=["cache"]
+        )
+        for name, cache in list(self.caches.items()):
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            evictions.add_metric([name], cache.evictions)
+            size.add_metric([name], cache.current_bytes)
+        return [hits, misses, evictions, size]
+
+
+_cache_collector = CacheCollector()
+REGISTRY.register(_cache_collector)
+
+
+def track_caches(caches: Iterable[Tuple[str, object]]):
+    """Report these caches, replacing any previously tracked under the same name"""
+    for name, cache in caches:
+        _cache_collector.caches[name] = cache
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
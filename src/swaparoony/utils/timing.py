@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+# Observers receive (stage_name, seconds) for every timed pipeline stage
+StageObserver = Callable[[str, float], None]
+
+_observers: List[StageObserver] = []
+
+
+def add_stage_observer(observer: StageObserver):
+    _observers.append(observer)
+
+
+def remove_stage_observer(observer: StageObserver):
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage and report it to the observers (no-op without any)"""
+    if not _observers:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for observer in list(_observers):
+            observer(name, elapsed)
+
+
+class StageRecorder:
+    """
+    Collects stage durations while attached, e.g.
+
+        with StageRecorder() as recorder:
+            service.process_face_swap_request(data)
+        recorder.durations["detection"]  # seconds, one entry per call
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, seconds: float):
+        with self._lock:
+            self.durations.setdefault(name, []).append(seconds)
+
+    def __enter__(self) -> "StageRecorder":
+        add_stage_observer(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        remove_stage_observer(self)
+
+    def totals(self) -> Dict[str, float]:
+        """Total seconds per stage"""
+        with self._lock:
+            return {name: sum(values) for name, values in self.durations.items()}
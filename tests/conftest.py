@@ -18,11 +18,43 @@ def mock_settings():
     mock_settings.face_analysis_name = "buffalo_l"
     mock_settings.ctx_id = 0
     mock_settings.det_size = (640, 640)
+    mock_settings.reduced_decode = False
+    mock_settings.ort_providers = None
+    mock_settings.ort_intra_op_threads = 0
+    mock_settings.ort_inter_op_threads = 0
+    mock_settings.ort_graph_optimization = "all"
+    mock_settings.ort_execution_mode = "sequential"
+    mock_settings.ort_enable_mem_arena = True
+    mock_settings.ort_enable_mem_pattern = True
     mock_settings.model_path = "models/test.onnx"
+    mock_settings.model_precision = "fp32"
     mock_settings.destination_images = ["test1.jpg", "test2.jpg"]
+    mock_settings.destination_cache_enabled = False
+    mock_settings.destination_cache_dir = None
+    mock_settings.destination_tiers = []
+    mock_settings.destination_workers = 2
+    mock_settings.detection_batch_size = 1
+    mock_settings.detection_batch_timeout_ms = 5.0
+    mock_settings.roi_paste_back = True
+    mock_settings.source_cache_bytes = 0
+    mock_settings.result_cache_bytes = 0
+    mock_settings.output_format = "jpeg"
+    mock_settings.output_quality = None
+    mock_settings.output_chroma_subsampling = None
+    mock_settings.output_max_edge = 0
+    mock_settings.metrics_enabled = False
+    mock_settings.profiling_token = None
+    mock_settings.profile_dir = "profiles"
     mock_settings.max_file_size = 2 * 1024 * 1024
     mock_settings.allowed_extensions = [".jpg", ".jpeg", ".png", ".webp"]
 
     with patch("src.swaparoony.services.face_swap_service.settings", mock_settings):
         with patch("src.swaparoony.core.config.settings", mock_settings):
-            yield mock_settings
+            with patch("src.swaparoony.utils.encoding.settings", mock_settings):
+                with patch(
+                    "src.swaparoony.services.onnx_sessions.settings", mock_settings
+                ):
+                    with patch(
+                        "src.swaparoony.services.profiling.settings", mock_settings
+                    ):
+                        yield mock_settings
@@ -0,0 +1,229 @@
+import io
+import json
+import zipfile
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi.testclient import TestClient
+
+from src.swaparoony.main import create_app
+from src.swaparoony.api.concurrency import InferenceLimiter
+from src.swaparoony.api.dependencies import get_face_swap_service, get_inference_limiter
+from src.swaparoony.api.responses import negotiate_media_type
+from src.swaparoony.core.exceptions import NoFaceDetectedError, ServiceOverloadedError
+from src.swaparoony.services.face_swap_service import DestinationResult
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        ("", "application/json"),
+        ("*/*", "application/json"),
+        ("application/json", "application/json"),
+        ("multipart/mixed", "multipart/mixed"),
+        ("application/zip", "application/zip"),
+        ("image/png", "application/json"),
+        ("application/json;q=0.5, multipart/mixed", "multipart/mixed"),
+        ("*/*;q=0.8, application/zip", "application/zip"),
+        ("multipart/mixed;q=0.2, application/json;q=0.9", "application/json"),
+    ],
+)
+def test_negotiate_media_type(accept, expected):
+    """Test Accept header negotiation defaults to JSON"""
+    assert negotiate_media_type(accept) == expected
+
+
+class TestSwapRoutes:
+    """Tests for the face swap HTTP routes"""
+
+    @pytest.fixture
+    def service(self):
+        service = Mock()
+        service._initialized = True
+        service.destination_images = [(None, "dest1.jpg"), (None, "dest2.jpg")]
+        return service
+
+    @pytest.fixture
+    def limiter(self):
+        limiter = InferenceLimiter(
+            max_concurrent=2, max_queued=2, queue_timeout=5.0, retry_after=3
+        )
+        yield limiter
+        limiter.shutdown()
+
+    @pytest.fixture
+    def client(self, service, limiter):
+        app = create_app()
+        app.dependency_overrides[get_face_swap_service] = lambda: service
+        app.dependency_overrides[get_inference_limiter] = lambda: limiter
+        return TestClient(app)
+
+    def upload(self):
+        return {"image": ("face.jpg", b"jpeg-bytes", "image/jpeg")}
+
+    def test_swap(self, client, service):
+        """Test the JSON swap route returns every swapped image"""
+        service.process_face_swap_request.return_value = ([("abc", "dest1.jpg")], 1)
+
+        response = client.post("/api/v1/swap", files=self.upload())
+
+        assert response.status_code == 200
+        assert response.json()["swapped_images"] == [
+            {"image_data": "abc", "destination_name": "dest1.jpg"}
+        ]
+
+    def test_swap_stream(self, client, service, limiter):
+        """Test streamed results end with a summary listing failures"""
+        results = iter(
+            [
+                DestinationResult("dest2.jpg", "def"),
+                DestinationResult("dest1.jpg", None, "No faces detected"),
+            ]
+        )
+        service.iter_destinations.return_value = (results, 2)
+
+        response = client.post(
+            "/api/v1/swap/stream", files=self.upload(), data={"source_face_id": 2}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {
+            "type": "image",
+            "image_data": "def",
+            "destination_name": "dest2.jpg",
+        }
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["faces_detected_in_source"] == 2
+        assert lines[-1]["failures"] == [
+            {"destination_name": "dest1.jpg", "detail": "No faces detected"}
+        ]
+        assert service.iter_destinations.call_args.kwargs["source_face_id"] == 2
+        assert limiter.in_flight == 0
+
+    def test_swap_stream_source_error(self, client, service, limiter):
+        """Test source errors are returned as HTTP errors before streaming"""
+        service.iter_destinations.side_effect = NoFaceDetectedError("no face")
+
+        response = client.post("/api/v1/swap/stream", files=self.upload())
+
+        assert response.status_code == 400
+        assert limiter.in_flight == 0
+
+    def test_metrics(self, client, service):
+        """Test /metrics exposes request outcomes in the Prometheus format"""
+        service.process_face_swap_request.side_effect = NoFaceDetectedError("no face")
+        client.post("/api/v1/swap", files=self.upload())
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'swaparoony_requests_total{endpoint="swap",outcome="NoFaceDetectedError"}'
+            in response.text
+        )
+
+    def test_swap_profiled(self, client, service, mock_settings, mocker):
+        """Test the admin token profiles the request and returns the profile id"""
+        mock_settings.profiling_token = "secret"
+        run_profiled = mocker.patch(
+            "src.swaparoony.api.routes.face_swap.run_profiled",
+            return_value=(([("abc", "dest1.jpg")], 1), "f" * 32),
+        )
+
+        response = client.post(
+            "/api/v1/swap", files=self.upload(), headers={"X-Profile-Token": "secret"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-id"] == "f" * 32
+        assert run_profiled.call_args.args == (service, "process_face_swap_request")
+
+    def test_swap_profile_token_rejected(self, client, service, mock_settings):
+        """Test a wrong profiling token is refused before any work"""
+        mock_settings.profiling_token = "secret"
+
+        response = client.post(
+            "/api/v1/swap?profile_token=guess", files=self.upload()
+        )
+
+        assert response.status_code == 403
+        service.process_face_swap_request.assert_not_called()
+
+    def test_swap_overloaded(self, client, limiter):
+        """Test a full queue is rejected with 503 and Retry-After"""
+        limiter.acquire = AsyncMock(side_effect=ServiceOverloadedError("busy", 3))
+
+        response = client.post("/api/v1/swap", files=self.upload())
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+
+    @pytest.fixture
+    def binary_results(self, service):
+        service.swap_destinations.return_value = (
+            [
+                DestinationResult("dest1.jpg", b"\xff\xd8one"),
+                DestinationResult("dest2.jpg", None, "No faces detected"),
+            ],
+            1,
+        )
+
+    def test_swap_multipart(self, client, service, binary_results):
+        """Test multipart/mixed returns metadata then raw image parts"""
+        response = client.post(
+            "/api/v1/swap", files=self.upload(), headers={"Accept": "multipart/mixed"}
+        )
+
+        assert response.status_code == 200
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/mixed; boundary=")
+        boundary = content_type.split("boundary=")[1].encode()
+        parts = response.content.split(b"--" + boundary)[1:-1]
+        assert len(parts) == 2
+        meta_headers, meta_body = parts[0].split(b"\r\n\r\n", 1)
+        metadata = json.loads(meta_body.strip())
+        assert metadata["destination_names"] == ["dest1.jpg"]
+        assert metadata["failures"][0]["destination_name"] == "dest2.jpg"
+        image_headers, image_body = parts[1].split(b"\r\n\r\n", 1)
+        assert b"Content-Type: image/jpeg" in image_headers
+        assert image_body == b"\xff\xd8one\r\n"
+        assert response.headers["x-faces-detected-in-source"] == "1"
+        assert service.swap_destinations.call_args.kwargs["raw"] is True
+
+    def test_swap_zip(self, client, binary_results):
+        """Test application/zip returns the images and metadata.json"""
+        response = client.post(
+            "/api/v1/swap", files=self.upload(), headers={"Accept": "application/zip"}
+        )
+
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == ["dest1.jpg", "metadata.json"]
+        assert archive.read("dest1.jpg") == b"\xff\xd8one"
+        assert json.loads(archive.read("metadata.json"))["faces_detected_in_source"] == 1
+
+    def test_swap_output_format(self, client, service, binary_results):
+        """Test per-request codec settings reach the service and part headers"""
+        response = client.post(
+            "/api/v1/swap",
+            files=self.upload(),
+            data={"output_format": "webp", "output_quality": 70, "output_max_edge": 512},
+            headers={"Accept": "multipart/mixed"},
+        )
+
+        assert response.status_code == 200
+        output_format = service.swap_destinations.call_args.kwargs["output_format"]
+        assert (output_format.codec, output_format.max_edge) == ("webp", 512)
+        assert b"Content-Type: image/webp" in response.content
+        assert b'filename="dest1.webp"' in response.content
+
+    def test_swap_invalid_output_format(self, client):
+        """Test an unknown codec is rejected before any work is done"""
+        response = client.post(
+            "/api/v1/swap", files=self.upload(), data={"output_format": "gif"}
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+
+import pytest
+
+from src.swaparoony.utils.cache import ByteBudgetLRU, SingleFlight, nbytes_of
+
+
+class TestByteBudgetLRU:
+    """Tests for the memory-bounded LRU cache"""
+
+    def test_get_put(self):
+        """Test stored values are returned and counted as hits"""
+        cache = ByteBudgetLRU(100)
+        cache.put("a", b"1234")
+
+        assert cache.get("a") == b"1234"
+        assert cache.get("b") is None
+        assert cache.stats() == {
+            "entries": 1,
+            "bytes": 4,
+            "max_bytes": 100,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+        }
+
+    def test_evicts_least_recently_used(self):
+        """Test inserting past the budget drops the oldest unused entries"""
+        cache = ByteBudgetLRU(10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+        cache.put("c", b"cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("c") == b"cccc"
+        assert cache.current_bytes == 8
+        assert cache.evictions == 1
+
+    def test_replacing_key_updates_size(self):
+        """Test re-inserting a key replaces its accounted size"""
+        cache = ByteBudgetLRU(10)
+        cache.put("a", b"aaaa")
+        cache.put("a", b"aa")
+
+        assert len(cache) == 1
+        assert cache.current_bytes == 2
+
+    def test_oversized_and_disabled(self):
+        """Test values over the budget, or any value with budget 0, are skipped"""
+        cache = ByteBudgetLRU(3)
+        cache.put("a", b"aaaa")
+        disabled = ByteBudgetLRU(0)
+        disabled.put("a", b"a")
+
+        assert len(cache) == 0
+        assert len(disabled) == 0
+
+    def test_nbytes_of_faces(self):
+        """Test sizes cover images plus arrays held by face dicts"""
+        image = np.zeros((10, 10, 3), dtype=np.uint8)
+        face = {"bbox": np.zeros(4, dtype=np.float32), "det_score": 0.9}
+
+        assert nbytes_of((image, [face])) == 300 + 16
+
+    def test_thread_safe(self):
+        """Test concurrent puts keep the byte accounting consistent"""
+        cache = ByteBudgetLRU(64)
+
+        def worker(offset):
+            for i in range(200):
+                cache.put(offset + i, b"x" * 8)
+                cache.get(offset + i - 1)
+
+        threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.current_bytes == 8 * len(cache) <= 64
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent identical calls"""
+
+    def test_waiters_share_leader_result(self):
+        """Test callers arriving mid-call wait for the leader's result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        def caller():
+            results.append(flight.do("key", compute))
+
+        threads = [threading.Thread(target=caller) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while len(calls) + flight.coalesced < 4:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == [1]
+        assert results == ["value"] * 4
+
+    def test_errors_propagate_and_are_not_remembered(self):
+        """Test a failed call raises for the caller and the next call reruns"""
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: "ok") == "ok"
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.swaparoony.api.concurrency import InferenceLimiter
+from src.swaparoony.core.exceptions import ServiceOverloadedError
+
+
+class TestInferenceLimiter:
+    """Tests for inference admission control"""
+
+    def make_limiter(self, max_concurrent=1, max_queued=1, queue_timeout=5.0):
+        return InferenceLimiter(
+            max_concurrent=max_concurrent,
+            max_queued=max_queued,
+            queue_timeout=queue_timeout,
+            retry_after=7,
+        )
+
+    def test_run_off_event_loop(self):
+        """Test blocking work runs on a worker thread and returns its result"""
+        limiter = self.make_limiter()
+
+        async def scenario():
+            return await limiter.run(lambda x: (x, threading.current_thread().name), 3)
+
+        value, thread_name = asyncio.run(scenario())
+
+        assert value == 3
+        assert thread_name.startswith("inference")
+        assert limiter.in_flight == 0
+        limiter.shutdown()
+
+    def test_rejects_when_queue_full(self):
+        """Test requests beyond running + queued capacity fail fast"""
+        limiter = self.make_limiter(max_concurrent=1, max_queued=1)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(limiter.run(release.wait))
+            await asyncio.sleep(0.05)
+            queued = asyncio.ensure_future(limiter.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+            assert (limiter.in_flight, limiter.queued) == (1, 1)
+
+            with pytest.raises(ServiceOverloadedError) as exc_info:
+                await limiter.run(lambda: "rejected")
+
+            release.set()
+            return exc_info.value, await running, await queued
+
+        error, _, queued_result = asyncio.run(scenario())
+
+        assert error.retry_after == 7
+        assert queued_result == "queued"
+        assert (limiter.in_flight, limiter.queued) == (0, 0)
+        limiter.shutdown()
+
+    def test_queue_timeout(self):
+        """Test a queued request gives up after queue_timeout"""
+        limiter = self.make_limiter(max_queued=5, queue_timeout=0.05)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(limiter.run(release.wait))
+            await asyncio.sleep(0.02)
+            with pytest.raises(ServiceOverloadedError, match="Timed out"):
+                await limiter.run(lambda: None)
+            release.set()
+            await running
+
+        asyncio.run(scenario())
+
+        assert limiter.queued == 0
+        limiter.shutdown()
+
+    def test_releases_slot_on_error(self):
+        """Test a failing call frees its slot and propagates the error"""
+        limiter = self.make_limiter()
+
+        def fail():
+            raise ValueError("boom")
+
+        async def scenario():
+            with pytest.raises(ValueError):
+                await limiter.run(fail)
+            return await limiter.run(lambda: "ok")
+
+        assert asyncio.run(scenario()) == "ok"
+        limiter.shutdown()
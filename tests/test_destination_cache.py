@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from insightface.app.common import Face
+
+from src.swaparoony.services.destination_cache import DestinationCache
+from src.swaparoony.services.face_swap_service import FaceSwapService
+
+
+class TestDestinationCache:
+    """Tests for the on-disk destination cache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return DestinationCache(tmp_path / "cache", "buffalo_l", (640, 640))
+
+    @pytest.fixture
+    def faces(self):
+        return [
+            Face(
+                bbox=np.array([10, 20, 30, 40], dtype=np.float32),
+                kps=np.ones((5, 2), dtype=np.float32),
+                det_score=np.float32(0.9),
+            ),
+            Face(
+                bbox=np.array([50, 20, 70, 40], dtype=np.float32),
+                kps=np.zeros((5, 2), dtype=np.float32),
+                det_score=np.float32(0.8),
+            ),
+        ]
+
+    def test_round_trip(self, cache, faces):
+        """Test saved pixels and faces load back unchanged"""
+        image = np.random.randint(0, 255, (32, 48, 3), dtype=np.uint8)
+        cache.save("dest.jpg", "abc123", image, faces)
+
+        loaded_image, loaded_faces = cache.load("dest.jpg", "abc123")
+
+        assert np.array_equal(loaded_image, image)
+        assert len(loaded_faces) == 2
+        assert np.array_equal(loaded_faces[1].bbox, faces[1].bbox)
+        assert np.array_equal(loaded_faces[0].kps, faces[0].kps)
+        assert loaded_faces[0].embedding is None
+
+    def test_round_trip_no_faces(self, cache):
+        """Test destinations without faces are cached as an empty index"""
+        cache.save("dest.jpg", "abc123", np.zeros((4, 4, 3), dtype=np.uint8), [])
+
+        _, loaded_faces = cache.load("dest.jpg", "abc123")
+
+        assert loaded_faces == []
+
+    def test_miss_on_changed_content(self, cache, faces):
+        """Test a different content hash does not hit the old entry"""
+        cache.save("dest.jpg", "abc123", np.zeros((4, 4, 3), dtype=np.uint8), faces)
+
+        assert cache.load("dest.jpg", "def456") is None
+
+    def test_miss_on_changed_det_size(self, cache, faces, tmp_path):
+        """Test entries are keyed by detection size"""
+        cache.save("dest.jpg", "abc123", np.zeros((4, 4, 3), dtype=np.uint8), faces)
+        other = DestinationCache(tmp_path / "cache", "buffalo_l", (320, 320))
+
+        assert other.load("dest.jpg", "abc123") is None
+
+    def test_save_replaces_stale_entry(self, cache, faces):
+        """Test rebuilding a changed file removes its previous entry"""
+        image = np.zeros((4, 4, 3), dtype=np.uint8)
+        cache.save("dest.jpg", "abc123", image, faces)
+        cache.save("dest.jpg", "def456", image, faces)
+
+        assert cache.load("dest.jpg", "abc123") is None
+        assert len(list(cache.cache_dir.iterdir())) == 2
+
+
+class TestFaceSwapServiceDestinationCache:
+    """Tests for loading the destination gallery through the cache"""
+
+    @pytest.fixture
+    def gallery(self, tmp_path, mock_settings):
+        image = np.full((40, 60, 3), 128, dtype=np.uint8)
+        paths = []
+        for name in ("a.png", "b.png"):
+            path = tmp_path / name
+            cv2.imwrite(str(path), image)
+            paths.append(str(path))
+        mock_settings.destination_images = paths
+        mock_settings.destination_cache_enabled = True
+        return tmp_path
+
+    def test_second_load_skips_detection(self, gallery):
+        """Test unchanged destinations are served from the cache"""
+        face = Face(bbox=np.array([1, 2, 3, 4], dtype=np.float32))
+        first = FaceSwapService()
+        first.app = Mock()
+        first.app.det_model.detect.return_value = (
+            np.array([[1, 2, 3, 4, 0.9]], dtype=np.float32),
+            None,
+        )
+        first._load_destination_images()
+
+        second = FaceSwapService()
+        second.app = Mock()
+        second._load_destination_images()
+
+        second.app.det_model.detect.assert_not_called()
+        assert len(second.destination_images) == 2
+        assert np.array_equal(
+            second.destination_images[0][0], first.destination_images[0][0]
+        )
+        assert np.array_equal(second.destination_faces["a.png"][0].bbox, face.bbox)
+
+    def test_changed_file_is_rebuilt(self, gallery):
+        """Test only the modified destination is re-detected"""
+        first = FaceSwapService()
+        first.app = Mock()
+        first.app.det_model.detect.return_value = (np.zeros((0, 5)), None)
+        first._load_destination_images()
+
+        cv2.imwrite(str(gallery / "b.png"), np.zeros((40, 60, 3), dtype=np.uint8))
+        second = FaceSwapService()
+        second.app = Mock()
+        second.app.det_model.detect.return_value = (np.zeros((0, 5)), None)
+        second._load_destination_images()
+
+        assert second.app.det_model.detect.call_count == 1
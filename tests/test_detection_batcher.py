@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.swaparoony.services.detection_batcher import (
+    DetectionBatcher,
+    letterbox,
+    supports_batching,
+)
+
+STRIDES = [8, 16, 32]
+NUM_ANCHORS = 2
+INPUT_SIZE = (64, 64)
+
+
+class FakeSession:
+    """
+    SCRFD-shaped session: the first stride-8 anchor of image i scores 0.9
+    with box distances of i + 1 (in stride units) and keypoints at its center
+    """
+
+    def __init__(self, batched):
+        self.batched = batched
+        self.batch_sizes = []
+
+    def get_inputs(self):
+        return [Mock(shape=["None", 3, "?", "?"])]
+
+    def run(self, output_names, feed):
+        batch = feed["input"].shape[0]
+        self.batch_sizes.append(batch)
+        scores, bboxes, kpss = [], [], []
+        for stride in STRIDES:
+            anchors = (INPUT_SIZE[0] // stride) * (INPUT_SIZE[1] // stride) * NUM_ANCHORS
+            score = np.zeros((batch, anchors, 1), dtype=np.float32)
+            bbox = np.zeros((batch, anchors, 4), dtype=np.float32)
+            if stride == 8:
+                score[:, 0] = 0.9
+                bbox[:, 0] = np.arange(1, batch + 1)[:, None]
+            scores.append(score)
+            bboxes.append(bbox)
+            kpss.append(np.zeros((batch, anchors, 10), dtype=np.float32))
+        outputs = scores + bboxes + kpss
+        if not self.batched:
+            outputs = [out.reshape((-1, out.shape[-1])) for out in outputs]
+        return outputs
+
+
+def make_det_model(batched=True):
+    det_model = Mock()
+    det_model.session = FakeSession(batched)
+    det_model.batched = batched
+    det_model.fmc = 3
+    det_model._feat_stride_fpn = STRIDES
+    det_model._num_anchors = NUM_ANCHORS
+    det_model.use_kps = True
+    det_model.det_thresh = 0.5
+    det_model.input_size = INPUT_SIZE
+    det_model.input_mean = 127.5
+    det_model.input_std = 128.0
+    det_model.input_name = "input"
+    det_model.output_names = [f"out{i}" for i in range(9)]
+    det_model.center_cache = {}
+    det_model.nms.side_effect = lambda dets: list(range(len(dets)))
+    return det_model
+
+
+class TestDetectionBatcher:
+    """Tests for cross-request detector micro-batching"""
+
+    def test_letterbox(self):
+        """Test images keep their aspect ratio and are padded bottom/right"""
+        image = np.full((32, 128, 3), 255, dtype=np.uint8)
+
+        padded, det_scale = letterbox(image, INPUT_SIZE)
+
+        assert padded.shape == (64, 64, 3)
+        assert det_scale == 0.5
+        assert padded[:16].min() == 255
+        assert padded[16:].max() == 0
+
+    def test_supports_batching(self):
+        """Test a fixed batch dimension disables batching"""
+        det_model = make_det_model()
+        assert supports_batching(det_model)
+
+        det_model.session = Mock()
+        det_model.session.get_inputs.return_value = [Mock(shape=[1, 3, 640, 640])]
+        assert not supports_batching(det_model)
+
+    @pytest.mark.parametrize("batched", [True, False], ids=["batched", "flattened"])
+    def test_concurrent_requests_share_one_run(self, batched):
+        """Test simultaneous requests run as one batch and get their own results"""
+        det_model = make_det_model(batched)
+        batcher = DetectionBatcher(det_model, max_batch=2, max_wait=5.0)
+        images = [
+            np.zeros((256, 256, 3), dtype=np.uint8),  # det_scale 0.25
+            np.zeros((64, 64, 3), dtype=np.uint8),  # det_scale 1.0
+        ]
+        results = {}
+        barrier = threading.Barrier(2)
+
+        def detect(index):
+            barrier.wait()
+            results[index] = batcher.detect(images[index])
+
+        threads = [threading.Thread(target=detect, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        batcher.shutdown()
+
+        assert det_model.session.batch_sizes == [2]
+        assert batcher.batches_run == 1
+        # Whichever request was queued first is batch row 0 (distance 1 * 8)
+        distances = {
+            index: (det[0, 2] - det[0, 0]) / 2 * (0.25 if index == 0 else 1.0)
+            for index, (det, _) in results.items()
+        }
+        assert sorted(distances.values()) == [8.0, 16.0]
+        for det, kpss in results.values():
+            assert det.shape == (1, 5)
+            assert det[0, 4] == pytest.approx(0.9)
+            assert kpss.shape == (1, 5, 2)
+
+    def test_single_request_uses_detect(self):
+        """Test a lone request goes through the detector's own detect()"""
+        det_model = make_det_model()
+        det_model.detect.return_value = ("det", "kpss")
+        batcher = DetectionBatcher(det_model, max_batch=4, max_wait=0.001)
+        image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        assert batcher.detect(image) == ("det", "kpss")
+        batcher.shutdown()
+
+        det_model.detect.assert_called_once_with(image, max_num=0, metric="default")
+        assert det_model.session.batch_sizes == []
+
+    def test_errors_reach_every_request(self):
+        """Test a failed batch raises in the waiting callers"""
+        det_model = make_det_model()
+        det_model.detect.side_effect = RuntimeError("detector failed")
+        batcher = DetectionBatcher(det_model, max_batch=1, max_wait=0.001)
+
+        with pytest.raises(RuntimeError, match="detector failed"):
+            batcher.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        batcher.shutdown()
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.swaparoony.core.exceptions import InvalidOutputFormatError
+from src.swaparoony.utils.encoding import (
+    encode_image,
+    get_output_format,
+    resize_to_max_edge,
+    resolve_output_format,
+)
+
+
+class TestOutputFormat:
+    """Tests for output codec selection and encoding"""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(0).integers(0, 255, (60, 80, 3), dtype=np.uint8)
+
+    def test_default_jpeg_has_no_params(self):
+        """Test the default format matches plain cv2.imencode(".jpg")"""
+        output_format = get_output_format()
+
+        assert output_format.extension == ".jpg"
+        assert output_format.media_type == "image/jpeg"
+        assert output_format.params == ()
+
+    def test_params_built_once(self):
+        """Test identical formats reuse the same parameter object"""
+        assert get_output_format("webp", 80) is get_output_format("webp", 80)
+
+    def test_jpeg_quality_and_subsampling(self):
+        """Test JPEG quality and chroma subsampling become encoder params"""
+        output_format = get_output_format("jpg", 85, "420")
+
+        assert output_format.codec == "jpeg"
+        assert output_format.params == (
+            cv2.IMWRITE_JPEG_QUALITY,
+            85,
+            cv2.IMWRITE_JPEG_SAMPLING_FACTOR,
+            cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+        )
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ("gif",),
+            ("jpeg", 0),
+            ("jpeg", 101),
+            ("webp", None, "420"),
+            ("jpeg", None, "411"),
+            ("jpeg", None, None, -1),
+        ],
+    )
+    def test_invalid_formats(self, args):
+        """Test invalid codec settings are rejected"""
+        with pytest.raises(InvalidOutputFormatError):
+            get_output_format(*args)
+
+    def test_resolve_uses_settings_defaults(self, mock_settings):
+        """Test unset request values fall back to settings"""
+        mock_settings.output_format = "webp"
+        mock_settings.output_quality = 70
+
+        output_format = resolve_output_format(max_edge=512)
+
+        assert output_format.codec == "webp"
+        assert output_format.params == (cv2.IMWRITE_WEBP_QUALITY, 70)
+        assert output_format.max_edge == 512
+
+    def test_resize_to_max_edge(self, image):
+        """Test the longest edge is capped and aspect ratio kept"""
+        assert resize_to_max_edge(image, 0) is image
+        assert resize_to_max_edge(image, 100) is image
+        assert resize_to_max_edge(image, 40).shape == (30, 40, 3)
+
+    @pytest.mark.parametrize("codec", ["jpeg", "webp", "png"])
+    def test_encode_round_trip(self, image, codec):
+        """Test encoded output decodes at the capped size"""
+        encoded = encode_image(image, get_output_format(codec, None, None, 40))
+
+        decoded = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == (30, 40, 3)
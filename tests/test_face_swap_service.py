@@ -1,10 +1,12 @@
 import pytest
 import numpy as np
+import onnxruntime
 import base64
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
-from src.swaparoony.services.face_swap_service import FaceSwapService
+from src.swaparoony.services.face_swap_service import DestinationResult, FaceSwapService
+from src.swaparoony.utils.encoding import get_output_format
 from src.swaparoony.core.exceptions import (
     NoFaceDetectedError,
     InsufficientFacesError,
@@ -49,8 +51,10 @@ class TestFaceSwapService:
     @patch("src.swaparoony.services.face_swap_service.insightface.model_zoo.get_model")
     @patch("src.swaparoony.services.face_swap_service.cv2.imread")
     @patch("src.swaparoony.services.face_swap_service.Path.exists")
+    @patch("src.swaparoony.services.face_swap_service.apply_session_config")
     def test_initialize_models_success(
         self,
+        mock_apply_session_config,
         mock_path_exists,
         mock_imread,
         mock_get_model,
@@ -61,6 +65,9 @@ class TestFaceSwapService:
         """Test successful model initialization"""
         # Setup mocks
         mock_app = Mock()
+        mock_app.det_model.detect.return_value = (np.zeros((0, 5)), None)
+        detector, recognizer = Mock(), Mock()
+        mock_app.models = {"detection": detector, "recognition": recognizer}
         mock_face_analysis.return_value = mock_app
         mock_swapper = Mock()
         mock_get_model.return_value = mock_swapper
@@ -77,10 +84,22 @@ class TestFaceSwapService:
         assert len(service.destination_images) == 2
 
         # Verify method calls
-        mock_face_analysis.assert_called_once_with(name="buffalo_l")
+        providers = onnxruntime.get_available_providers()
+        mock_face_analysis.assert_called_once_with(
+            name="buffalo_l",
+            allowed_modules=["detection", "recognition"],
+            providers=providers,
+        )
         mock_app.prepare.assert_called_once_with(ctx_id=0, det_size=(640, 640))
         mock_get_model.assert_called_once_with(
-            "models/test.onnx", download=True, download_zip=True
+            "models/test.onnx",
+            download=False,
+            download_zip=False,
+            providers=providers,
+        )
+        # Every session is rebuilt with the configured options
+        mock_apply_session_config.assert_called_once_with(
+            [detector, recognizer, mock_swapper]
         )
 
     @patch("src.swaparoony.services.face_swap_service.FaceAnalysis")
@@ -99,6 +118,8 @@ class TestFaceSwapService:
         self, mock_path_exists, mock_imread, service, mock_settings
     ):
         """Test successful destination image loading"""
+        service.app = Mock()
+        service.app.det_model.detect.return_value = (np.zeros((0, 5)), None)
         mock_imread.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
         mock_path_exists.return_value = True
 
@@ -107,6 +128,74 @@ class TestFaceSwapService:
         assert len(service.destination_images) == 2
         assert all(isinstance(img, np.ndarray) for img, _ in service.destination_images)
 
+    @patch("src.swaparoony.services.face_swap_service.cv2.imread")
+    @patch("src.swaparoony.services.face_swap_service.Path.exists")
+    def test_load_destination_images_indexes_faces(
+        self, mock_path_exists, mock_imread, service, mock_settings
+    ):
+        """Test destination faces are detected once, sorted, at load time"""
+        service.app = Mock()
+        service.app.det_model.detect.return_value = (
+            np.array([[200.0, 100, 300, 200, 0.9], [100.0, 100, 200, 200, 0.8]]),
+            None,
+        )
+        mock_imread.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_path_exists.return_value = True
+
+        service._load_destination_images()
+
+        assert set(service.destination_faces) == {"test1.jpg", "test2.jpg"}
+        faces = service.destination_faces["test1.jpg"]
+        assert [face.bbox[0] for face in faces] == [100.0, 200.0]
+        assert all(face.embedding is None for face in faces)
+        assert service.app.det_model.detect.call_count == 2
+
+    @patch("src.swaparoony.services.face_swap_service.cv2.imread")
+    @patch("src.swaparoony.services.face_swap_service.Path.exists")
+    def test_load_destination_images_builds_tiers(
+        self, mock_path_exists, mock_imread, service, mock_settings
+    ):
+        """Test destinations get downscaled tiers with their faces mapped onto them"""
+        mock_settings.destination_tiers = [1024, 500, 4000]
+        service.app = Mock()
+        kps = np.array([[[300.0, 400], [700, 400], [500, 600], [350, 800], [650, 800]]])
+        service.app.det_model.detect.return_value = (
+            np.array([[200.0, 300, 800, 900, 0.9]]),
+            kps,
+        )
+        mock_imread.return_value = np.zeros((1500, 2000, 3), dtype=np.uint8)
+        mock_path_exists.return_value = True
+
+        service._load_destination_images()
+
+        tiers = service.destination_tiers["test1.jpg"]
+        # Tiers at least as large as the image are skipped
+        assert [edge for edge, _, _ in tiers] == [500, 1024]
+        edge, image, (face,) = tiers[0]
+        assert image.shape == (375, 500, 3)
+        assert np.allclose(face.bbox, [50, 75, 200, 225])
+        assert np.allclose(face.kps, kps[0] / 4)
+        # The full-resolution faces are untouched
+        assert np.allclose(service.destination_faces["test1.jpg"][0].kps, kps[0])
+
+    def test_destination_tier_selection(self, service, mock_face):
+        """Test the smallest tier covering the output edge is used"""
+        full = np.zeros((1500, 2000, 3), dtype=np.uint8)
+        small, medium = np.zeros((375, 500, 3)), np.zeros((768, 1024, 3))
+        service.destination_tiers = {
+            "dest1.jpg": [(500, small, ["small"]), (1024, medium, ["medium"])]
+        }
+
+        def pick(max_edge):
+            return service._destination_tier("dest1.jpg", full, ["full"], max_edge)[1]
+
+        assert pick(0) == ["full"]
+        assert pick(400) == ["small"]
+        assert pick(500) == ["small"]
+        assert pick(800) == ["medium"]
+        assert pick(1600) == ["full"]
+        assert service._destination_tier("other.jpg", full, ["full"], 400)[1] == ["full"]
+
     @patch("src.swaparoony.services.face_swap_service.cv2.imread")
     @patch("src.swaparoony.services.face_swap_service.Path.exists")
     def test_load_destination_images_none_found(
@@ -160,17 +249,13 @@ class TestFaceSwapService:
         expected = base64.b64encode(mock_buffer).decode("utf-8")
         assert result == expected
 
-    def test_get_faces_sorting(self, service, mock_face):
+    def test_get_faces_sorting(self, service):
         """Test face detection and sorting"""
         service.app = Mock()
-
-        # Create faces with different x coordinates
-        face1 = Mock()
-        face1.bbox = [200, 100, 300, 200]
-        face2 = Mock()
-        face2.bbox = [100, 100, 200, 200]
-
-        service.app.get.return_value = [face1, face2]
+        service.app.det_model.detect.return_value = (
+            np.array([[200.0, 100, 300, 200, 0.8], [100.0, 100, 200, 200, 0.9]]),
+            np.zeros((2, 5, 2)),
+        )
 
         result = service._get_faces(np.zeros((100, 100, 3)))
 
@@ -178,6 +263,60 @@ class TestFaceSwapService:
         assert len(result) == 2
         assert result[0].bbox[0] == 100
         assert result[1].bbox[0] == 200
+        assert result[0].det_score == 0.9
+        service.app.det_model.detect.assert_called_once()
+
+    def test_get_faces_through_detection_batcher(self, service):
+        """Test batched detections become sorted faces"""
+        service.app = Mock()
+        service._detection_batcher = Mock()
+        service._detection_batcher.detect.return_value = (
+            np.array([[50.0, 0, 90, 40, 0.8], [10.0, 0, 40, 30, 0.9]]),
+            np.zeros((2, 5, 2)),
+        )
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        faces = service._get_faces(image)
+
+        assert [face.bbox[0] for face in faces] == [10.0, 50.0]
+        service.app.det_model.detect.assert_not_called()
+
+    def test_get_faces_skips_recognition(self, service):
+        """Test detection never runs the recognition model"""
+        recognition = Mock()
+        service.app = Mock(models={"recognition": recognition})
+        service.app.det_model.detect.return_value = (
+            np.array([[10.0, 0, 40, 30, 0.9]] * 12),
+            np.zeros((12, 5, 2)),
+        )
+
+        faces = service._get_faces(np.zeros((100, 100, 3)))
+
+        assert len(faces) == 12
+        recognition.get.assert_not_called()
+        service.app.get.assert_not_called()
+
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    def test_analyze_source_embeds_selected_face_only(
+        self, mock_get_faces, mock_decode, service
+    ):
+        """Test only the requested source face gets an embedding"""
+        from insightface.app.common import Face
+
+        recognition = Mock()
+        recognition.get.return_value = np.ones(512, dtype=np.float32)
+        service.app = Mock(models={"recognition": recognition})
+        faces = [Face(bbox=np.array([x, 0.0, x + 10, 10])) for x in (0.0, 20.0, 40.0)]
+        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_get_faces.return_value = faces
+
+        _, _, face = service._analyze_source(b"group", 2)
+
+        assert face is faces[1]
+        recognition.get.assert_called_once_with(mock_decode.return_value, faces[1])
+        assert faces[1].embedding is not None
+        assert faces[0].embedding is None and faces[2].embedding is None
 
     def test_validate_face_index_no_faces(self, service):
         """Test validation when no faces detected"""
@@ -226,11 +365,58 @@ class TestFaceSwapService:
         expected_result = np.ones((100, 100, 3), dtype=np.uint8)
         service.swapper.get.return_value = expected_result
 
-        result = service.swap_face_on_image(sample_image, sample_image, 1, 1)
+        result = service.swap_face_on_image(
+            sample_image, sample_image, 1, 1, roi_paste_back=False
+        )
 
         assert np.array_equal(result, expected_result)
         service.swapper.get.assert_called_once()
 
+    @patch.object(FaceSwapService, "_get_faces")
+    def test_swap_face_on_image_roi_paste_back(
+        self, mock_get_faces, service, sample_image, mock_face
+    ):
+        """Test the ROI paste-back path swaps through the batched helpers"""
+        service._initialized = True
+        service.swapper = Mock()
+        mock_get_faces.side_effect = [[mock_face], [mock_face]]
+        target, crop = Mock(), np.zeros((128, 128, 3), dtype=np.uint8)
+        expected_result = np.ones((100, 100, 3), dtype=np.uint8)
+
+        with patch.object(
+            FaceSwapService, "_swap_batch", return_value=[(target, crop)]
+        ) as swap_batch, patch(
+            "src.swaparoony.services.swap_ops.paste_back_roi",
+            return_value=expected_result,
+        ) as paste_back_roi:
+            result = service.swap_face_on_image(sample_image, sample_image, 1, 1)
+
+        assert result is expected_result
+        swap_batch.assert_called_once_with(mock_face, [(sample_image, mock_face)])
+        paste_back_roi.assert_called_once_with(target, crop)
+        service.swapper.get.assert_not_called()
+
+    @patch.object(FaceSwapService, "_get_faces")
+    def test_swap_face_on_image_uses_indexed_dest_faces(
+        self, mock_get_faces, service, sample_image, mock_face
+    ):
+        """Test that pre-indexed destination faces skip destination detection"""
+        service._initialized = True
+        service.swapper = Mock()
+        mock_get_faces.return_value = [mock_face]
+
+        service.swap_face_on_image(
+            sample_image,
+            sample_image,
+            1,
+            1,
+            dest_faces=[mock_face],
+            roi_paste_back=False,
+        )
+
+        mock_get_faces.assert_called_once_with(sample_image)
+        service.swapper.get.assert_called_once()
+
     @patch.object(FaceSwapService, "_get_faces")
     def test_swap_face_on_image_no_source_face(
         self, mock_get_faces, service, sample_image
@@ -244,8 +430,8 @@ class TestFaceSwapService:
 
     @patch.object(FaceSwapService, "_decode_image")
     @patch.object(FaceSwapService, "_get_faces")
-    @patch.object(FaceSwapService, "swap_face_on_image")
-    @patch.object(FaceSwapService, "_encode_image")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
     def test_process_face_swap_request_success(
         self,
         mock_encode,
@@ -263,17 +449,130 @@ class TestFaceSwapService:
         # Setup mocks
         mock_decode.return_value = np.zeros((100, 100, 3))
         mock_get_faces.return_value = [mock_face]  # One face detected
-        mock_swap.return_value = np.ones((100, 100, 3))
-        mock_encode.return_value = "base64_encoded_image"
+        mock_swap.return_value = [(Mock(), np.ones((128, 128, 3)))]
+        mock_encode.return_value = b"encoded_image"
 
         results, faces_count = service.process_face_swap_request(
             sample_image_bytes, 1, 1
         )
 
         assert len(results) == 1
-        assert results[0] == ("base64_encoded_image", "dest1.jpg")
+        assert results[0] == (base64.b64encode(b"encoded_image").decode(), "dest1.jpg")
         assert faces_count == 1
 
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
+    def test_process_face_swap_request_detects_source_once(
+        self, mock_encode, mock_swap, mock_get_faces, mock_decode, service, mock_face
+    ):
+        """Test the source is decoded and detected once for all destinations"""
+        service._initialized = True
+        service.destination_images = [
+            (np.zeros((100, 100, 3)), "dest1.jpg"),
+            (np.zeros((100, 100, 3)), "dest2.jpg"),
+        ]
+        service.destination_faces = {"dest1.jpg": [mock_face], "dest2.jpg": [mock_face]}
+
+        mock_decode.return_value = np.zeros((100, 100, 3))
+        mock_get_faces.return_value = [mock_face]
+        mock_swap.return_value = [(Mock(), np.ones((128, 128, 3)))] * 2
+        mock_encode.return_value = b"encoded_image"
+
+        results, faces_count = service.process_face_swap_request(b"data", 1, 1)
+
+        assert len(results) == 2
+        mock_decode.assert_called_once_with(b"data")
+        mock_get_faces.assert_called_once()
+
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    def test_analyze_source_cached_by_content(
+        self, mock_get_faces, mock_decode, mock_settings, mock_face
+    ):
+        """Test resubmitted uploads skip decoding and detection"""
+        mock_settings.source_cache_bytes = 1024 * 1024
+        service = FaceSwapService()
+        other_face = Mock()
+        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_get_faces.return_value = [mock_face, other_face]
+
+        assert service._analyze_source(b"data", 1)[2] is mock_face
+        assert service._analyze_source(b"data", 2)[2] is other_face
+        service._analyze_source(b"other", 1)
+
+        assert mock_decode.call_count == 2
+        assert mock_get_faces.call_count == 2
+        stats = service.source_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+    def test_analyze_source_reduced_decode(self, mock_settings):
+        """Test large JPEGs are detected on a reduced decode in full-res coordinates"""
+        import cv2
+
+        mock_settings.reduced_decode = True
+        mock_settings.source_cache_bytes = 64 * 1024 * 1024
+        service = FaceSwapService()
+        recognition = Mock(input_size=(112, 112))
+        service.app = Mock(models={"recognition": recognition})
+        service.app.det_model.detect.return_value = (
+            np.array([[100.0, 10, 300, 210, 0.9], [10.0, 10, 50, 50, 0.9]]),
+            np.ones((2, 5, 2)),
+        )
+        data = cv2.imencode(".jpg", np.zeros((3000, 4000, 3), dtype=np.uint8))[1]
+
+        image, faces, small = service._analyze_source(data.tobytes(), 1)
+        _, _, large = service._analyze_source(data.tobytes(), 2)
+
+        assert image.shape == (750, 1000, 3)
+        service.app.det_model.detect.assert_called_once()
+        np.testing.assert_array_equal(small.bbox, [40, 40, 200, 200])
+        np.testing.assert_array_equal(small.kps, np.full((5, 2), 4.0))
+        # The small face is embedded from full-resolution pixels, the large
+        # one from the reduced decode with keypoints mapped back to it
+        (small_image, small_crop), (large_image, large_crop) = [
+            call.args for call in recognition.get.call_args_list
+        ]
+        assert small_image.shape == (3000, 4000, 3)
+        assert small_crop is small
+        assert large_image is image
+        np.testing.assert_array_equal(large_crop.kps, np.ones((5, 2)))
+        assert large.embedding is recognition.get.return_value
+
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
+    def test_process_face_swap_request_single_swapper_batch(
+        self, mock_encode, mock_swap, mock_get_faces, mock_decode, service, mock_face
+    ):
+        """Test all destination faces go to the swapper in one batch"""
+        service._initialized = True
+        dest_face = Mock()
+        service.destination_images = [
+            (np.zeros((100, 100, 3)), "dest1.jpg"),
+            (np.zeros((100, 100, 3)), "dest2.jpg"),
+            (np.zeros((100, 100, 3)), "dest3.jpg"),
+        ]
+        service.destination_faces = {
+            "dest1.jpg": [dest_face],
+            "dest2.jpg": [],
+            "dest3.jpg": [dest_face],
+        }
+        mock_decode.return_value = np.zeros((100, 100, 3))
+        mock_get_faces.return_value = [mock_face]
+        mock_swap.return_value = [(Mock(), np.ones((128, 128, 3)))] * 2
+        mock_encode.return_value = b"encoded_image"
+
+        results, _ = service.process_face_swap_request(b"data", 1, 1)
+
+        mock_swap.assert_called_once()
+        source_face, targets = mock_swap.call_args[0]
+        assert source_face is mock_face
+        assert [face for _, face in targets] == [dest_face, dest_face]
+        assert [name for _, name in results] == ["dest1.jpg", "dest3.jpg"]
+
     @patch.object(FaceSwapService, "_decode_image")
     @patch.object(FaceSwapService, "_get_faces")
     def test_process_face_swap_request_invalid_source(
@@ -290,8 +589,8 @@ class TestFaceSwapService:
 
     @patch.object(FaceSwapService, "_decode_image")
     @patch.object(FaceSwapService, "_get_faces")
-    @patch.object(FaceSwapService, "swap_face_on_image")
-    @patch.object(FaceSwapService, "_encode_image")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
     def test_process_face_swap_request_partial_failure(
         self,
         mock_encode,
@@ -314,8 +613,18 @@ class TestFaceSwapService:
         mock_get_faces.return_value = [mock_face]
 
         # First swap succeeds, second fails
-        mock_swap.side_effect = [np.ones((100, 100, 3)), Exception("Swap failed")]
-        mock_encode.return_value = "base64_encoded_image"
+        failing_crop = np.zeros((128, 128, 3))
+        mock_swap.return_value = [
+            (Mock(), np.ones((128, 128, 3))),
+            (Mock(), failing_crop),
+        ]
+
+        def paste_and_encode(target, crop, **kwargs):
+            if crop is failing_crop:
+                raise Exception("Swap failed")
+            return b"encoded_image"
+
+        mock_encode.side_effect = paste_and_encode
 
         results, faces_count = service.process_face_swap_request(
             sample_image_bytes, 1, 1
@@ -323,9 +632,180 @@ class TestFaceSwapService:
 
         # Should only return successful swaps
         assert len(results) == 1
-        assert results[0] == ("base64_encoded_image", "dest1.jpg")
+        assert results[0] == (base64.b64encode(b"encoded_image").decode(), "dest1.jpg")
         assert faces_count == 1
 
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
+    def test_swap_destinations_reports_failures_in_order(
+        self, mock_encode, mock_swap, mock_get_faces, mock_decode, service, mock_face
+    ):
+        """Test every destination gets a result, failures included"""
+        service._initialized = True
+        service.destination_images = [
+            (np.zeros((100, 100, 3)), "dest1.jpg"),
+            (np.zeros((100, 100, 3)), "dest2.jpg"),
+            (np.zeros((100, 100, 3)), "dest3.jpg"),
+        ]
+        service.destination_faces = {
+            "dest1.jpg": [mock_face],
+            "dest2.jpg": [],
+            "dest3.jpg": [mock_face],
+        }
+        mock_decode.return_value = np.zeros((100, 100, 3))
+        mock_get_faces.return_value = [mock_face]
+        mock_swap.return_value = [(Mock(), "crop1"), (Mock(), "crop3")]
+        mock_encode.side_effect = lambda target, crop, **kwargs: crop.encode()
+
+        results, faces_count = service.swap_destinations(b"data", 1, 1, raw=True)
+
+        assert [r.destination_name for r in results] == [
+            "dest1.jpg",
+            "dest2.jpg",
+            "dest3.jpg",
+        ]
+        assert results[0].image_data == b"crop1"
+        assert results[1].image_data is None
+        assert "No faces detected in destination" in results[1].error
+        assert results[2].image_data == b"crop3"
+        assert faces_count == 1
+
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
+    def test_swap_destinations_uses_output_tier(
+        self, mock_encode, mock_swap, mock_get_faces, mock_decode, service, mock_face
+    ):
+        """Test a smaller output size swaps on the matching destination tier"""
+        service._initialized = True
+        full = np.zeros((1500, 2000, 3))
+        tier = np.zeros((768, 1024, 3))
+        tier_face = Mock()
+        service.destination_images = [(full, "dest1.jpg")]
+        service.destination_faces = {"dest1.jpg": [mock_face]}
+        service.destination_tiers = {"dest1.jpg": [(1024, tier, [tier_face])]}
+        mock_decode.return_value = np.zeros((100, 100, 3))
+        mock_get_faces.return_value = [mock_face]
+        mock_swap.return_value = [(Mock(), "crop")]
+        mock_encode.side_effect = lambda target, crop, **kwargs: crop.encode()
+
+        service.swap_destinations(
+            b"data", raw=True, output_format=get_output_format("jpeg", max_edge=800)
+        )
+        service.swap_destinations(b"data", raw=True)
+
+        ((tier_image, tier_target),) = mock_swap.call_args_list[0].args[1]
+        assert tier_image is tier and tier_target is tier_face
+        ((full_image, full_target),) = mock_swap.call_args_list[1].args[1]
+        assert full_image is full and full_target is mock_face
+
+    @patch.object(FaceSwapService, "_decode_image")
+    @patch.object(FaceSwapService, "_get_faces")
+    @patch.object(FaceSwapService, "_swap_batch")
+    @patch.object(FaceSwapService, "_paste_and_encode")
+    def test_swap_destinations_result_cache(
+        self, mock_encode, mock_swap, mock_get_faces, mock_decode, mock_settings, mock_face
+    ):
+        """Test identical requests are served from the result cache"""
+        mock_settings.result_cache_bytes = 1024 * 1024
+        service = FaceSwapService()
+        service._initialized = True
+        service.destination_images = [(np.zeros((100, 100, 3)), "dest1.jpg")]
+        service.destination_faces = {"dest1.jpg": [mock_face]}
+        mock_decode.return_value = np.zeros((100, 100, 3))
+        mock_get_faces.return_value = [mock_face]
+        mock_swap.return_value = [(Mock(), np.ones((128, 128, 3)))]
+        mock_encode.return_value = b"encoded_image"
+
+        first = service.swap_destinations(b"data", 1, 1, raw=True)
+        second = service.process_face_swap_request(b"data", 1, 1)
+        service.swap_destinations(
+            b"data", 1, 1, raw=True, output_format=get_output_format("png")
+        )
+
+        assert first[0][0].image_data == b"encoded_image"
+        assert second == ([(base64.b64encode(b"encoded_image").decode(), "dest1.jpg")], 1)
+        # The different output format missed and swapped again
+        assert mock_swap.call_count == 2
+        assert service.result_cache.hits == 1
+
+    def test_swap_destinations_coalesces_concurrent_requests(self, service):
+        """Test concurrent identical requests share one swap"""
+        import threading
+
+        service._initialized = True
+        service.destination_images = [(None, "dest1.jpg")]
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute(request_key, data):
+            calls.append(request_key)
+            started.set()
+            release.wait(5)
+            return [DestinationResult("dest1.jpg", b"img")], 1
+
+        outcomes = []
+        with patch.object(service, "_compute_results", side_effect=compute):
+            threads = [
+                threading.Thread(
+                    target=lambda: outcomes.append(
+                        service.swap_destinations(b"data", 1, 1, raw=True)
+                    )
+                )
+                for _ in range(3)
+            ]
+            threads[0].start()
+            started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            while service._inflight_swaps.coalesced < 2:
+                pass
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert len(calls) == 1
+        assert len(outcomes) == 3
+        assert all(result[0][0].image_data == b"img" for result in outcomes)
+
+    def test_fan_out_yields_as_completed(self, service):
+        """Test parallel finishing reports indexes and captures errors"""
+        import threading
+        import time
+
+        threads = set()
+
+        def work(delay, value):
+            threads.add(threading.current_thread().name)
+            time.sleep(delay)
+            if value == "bad":
+                raise ValueError(value)
+            return value
+
+        completed = list(
+            service._fan_out(work, [(0.05, "a"), (0.0, "bad"), (0.0, "c")])
+        )
+        results = dict(completed)
+
+        assert completed[-1][0] == 0  # The slowest item finishes last
+
+        assert results[0] == "a"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == "c"
+        assert all(name.startswith("destination") for name in threads)
+
+    def test_fan_out_sequential_when_single_worker(self, mock_settings):
+        """Test destination_workers=1 finishes destinations inline"""
+        mock_settings.destination_workers = 1
+        service = FaceSwapService()
+
+        assert service._destination_executor is None
+        assert list(service._fan_out(lambda x: x * 2, [(1,), (2,)])) == [(0, 2), (1, 4)]
+
     def test_not_initialized_error_propagation(self, service):
         """Test that methods properly check initialization"""
         methods_requiring_init = [
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.swaparoony.utils.image_utils import detection_reduction, jpeg_dimensions
+
+
+def encode(width, height, extension=".jpg", params=()):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    return cv2.imencode(extension, image, list(params))[1].tobytes()
+
+
+class TestReducedDecode:
+    """Tests for picking a reduced JPEG decode from header dimensions"""
+
+    def test_jpeg_dimensions(self):
+        """Test width and height are read from the frame header"""
+        assert jpeg_dimensions(encode(300, 200)) == (300, 200)
+
+    def test_jpeg_dimensions_progressive(self):
+        """Test progressive JPEGs (SOF2) are read too"""
+        data = encode(320, 240, params=(cv2.IMWRITE_JPEG_PROGRESSIVE, 1))
+
+        assert jpeg_dimensions(data) == (320, 240)
+
+    def test_jpeg_dimensions_not_jpeg(self):
+        """Test other formats and truncated data are not parsed"""
+        assert jpeg_dimensions(encode(300, 200, ".png")) is None
+        assert jpeg_dimensions(encode(300, 200)[:20]) is None
+
+    @pytest.mark.parametrize(
+        "width,height,expected",
+        [(4032, 3024, 4), (5120, 3840, 8), (1600, 1200, 2), (1000, 800, 1)],
+    )
+    def test_detection_reduction(self, width, height, expected):
+        """Test the long edge stays at or above det_size after reduction"""
+        assert detection_reduction(encode(width, height), (640, 640)) == expected
+
+    def test_detection_reduction_png(self):
+        """Test non-JPEG uploads decode at full size"""
+        assert detection_reduction(encode(4000, 3000, ".png"), (640, 640)) == 1
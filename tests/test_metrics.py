@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from src.swaparoony.core.exceptions import NoFaceDetectedError
+from src.swaparoony.services.face_swap_service import DestinationResult
+from src.swaparoony.utils.cache import ByteBudgetLRU
+from src.swaparoony.utils.metrics import (
+    count_destination_failures,
+    disable_stage_metrics,
+    enable_stage_metrics,
+    outcome_of,
+    record_request,
+    track_caches,
+    track_limiter,
+)
+from src.swaparoony.utils.timing import stage
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics:
+    """Tests for the Prometheus instrumentation"""
+
+    def test_outcome_labels(self):
+        """Test outcomes are the exception type, with one label for the unexpected"""
+        assert outcome_of(None) == "success"
+        assert outcome_of(NoFaceDetectedError("none")) == "NoFaceDetectedError"
+        assert outcome_of(KeyError("x")) == "UnexpectedError"
+
+    def test_record_request(self):
+        """Test request counters by endpoint and outcome"""
+        before = sample(
+            "swaparoony_requests_total", endpoint="test", outcome="NoFaceDetectedError"
+        )
+        record_request("test", NoFaceDetectedError("none"))
+        after = sample(
+            "swaparoony_requests_total", endpoint="test", outcome="NoFaceDetectedError"
+        )
+        assert after == before + 1
+
+    def test_stage_histogram(self):
+        """Test stages are observed only while stage metrics are enabled"""
+        before = sample("swaparoony_stage_seconds_count", stage="metrics_test")
+        enable_stage_metrics()
+        enable_stage_metrics()  # idempotent
+        try:
+            with stage("metrics_test"):
+                pass
+        finally:
+            disable_stage_metrics()
+        with stage("metrics_test"):
+            pass
+
+        assert sample("swaparoony_stage_seconds_count", stage="metrics_test") == before + 1
+
+    def test_destination_failures(self):
+        """Test failed destinations are counted as results pass through"""
+        before = sample("swaparoony_destination_failures_total", destination="bad.jpg")
+        results = [
+            DestinationResult("good.jpg", b"ok"),
+            DestinationResult("bad.jpg", None, "No faces detected"),
+        ]
+
+        assert list(count_destination_failures(results)) == results
+        after = sample("swaparoony_destination_failures_total", destination="bad.jpg")
+        assert after == before + 1
+
+    def test_limiter_gauges(self):
+        """Test queue depth and in-flight gauges read the limiter when scraped"""
+        limiter = SimpleNamespace(in_flight=3, queued=5)
+        track_limiter(limiter)
+
+        assert sample("swaparoony_in_flight_requests") == 3
+        assert sample("swaparoony_queued_requests") == 5
+        limiter.queued = 1
+        assert sample("swaparoony_queued_requests") == 1
+
+    def test_cache_metrics(self):
+        """Test cache hit and miss counters come from the cache itself"""
+        cache = ByteBudgetLRU(1024)
+        track_caches([("metrics_test", cache)])
+        cache.put("a", b"x" * 10)
+        cache.get("a")
+        cache.get("b")
+
+        assert sample("swaparoony_cache_hits_total", cache="metrics_test") == 1
+        assert sample("swaparoony_cache_misses_total", cache="metrics_test") == 1
+        assert sample("swaparoony_cache_bytes", cache="metrics_test") == 10
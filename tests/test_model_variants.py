@@ -0,0 +1,53 @@
+import numpy as np
+import onnx
+import pytest
+from insightface.model_zoo.inswapper import INSwapper
+from onnx import numpy_helper
+
+from src.swaparoony.core.exceptions import ModelLoadError
+from src.swaparoony.services.model_variants import (
+    build_swapper_variant,
+    face_analysis_pack,
+    variant_path,
+)
+from tests.test_swap_ops import build_swapper_model
+
+
+class TestModelVariants:
+    """Tests for precision tier selection and building"""
+
+    def test_variant_names(self):
+        """Test FP32 keeps the configured names and other tiers are suffixed"""
+        assert variant_path("models/inswapper_128.onnx", "fp32") == (
+            "models/inswapper_128.onnx"
+        )
+        assert variant_path("models/inswapper_128.onnx", "INT8") == (
+            "models/inswapper_128.int8.onnx"
+        )
+        assert face_analysis_pack("buffalo_l", "fp32") == "buffalo_l"
+        assert face_analysis_pack("buffalo_l", "fp16") == "buffalo_l_fp16"
+
+    def test_invalid_precision(self):
+        with pytest.raises(ModelLoadError, match="Unsupported model precision"):
+            variant_path("models/inswapper_128.onnx", "int4")
+        with pytest.raises(ModelLoadError):
+            build_swapper_variant("models/inswapper_128.onnx", "fp32")
+
+    def test_int8_swapper_keeps_emap(self, tmp_path):
+        """Test the quantized swapper still loads in INSwapper with the FP32 emap"""
+        model_path = build_swapper_model(tmp_path / "inswapper_128.onnx")
+
+        quantized = build_swapper_variant(model_path, "int8")
+
+        assert quantized == str(tmp_path / "inswapper_128.int8.onnx")
+        original = numpy_helper.to_array(onnx.load(model_path).graph.initializer[-1])
+        swapper = INSwapper(model_file=quantized)
+        np.testing.assert_array_equal(swapper.emap, original)
+
+        target = np.random.default_rng(1).random((1, 3, 128, 128), dtype=np.float32)
+        latent = np.random.default_rng(2).random((1, 512), dtype=np.float32)
+        feed = {"target": target, "source": latent}
+        expected = INSwapper(model_file=model_path).session.run(None, feed)[0]
+        np.testing.assert_allclose(
+            swapper.session.run(None, feed)[0], expected, atol=0.05
+        )
@@ -0,0 +1,73 @@
+from unittest.mock import Mock, patch
+
+import onnxruntime
+import pytest
+
+from src.swaparoony.core.exceptions import ModelLoadError
+from src.swaparoony.services.onnx_sessions import (
+    apply_session_config,
+    build_session_options,
+    session_providers,
+)
+
+
+class TestSessionConfig:
+    """Tests for ONNX Runtime session tuning"""
+
+    def test_build_session_options(self, mock_settings):
+        """Test every ORT_* setting lands on the SessionOptions"""
+        mock_settings.ort_intra_op_threads = 2
+        mock_settings.ort_inter_op_threads = 1
+        mock_settings.ort_graph_optimization = "extended"
+        mock_settings.ort_execution_mode = "parallel"
+        mock_settings.ort_enable_mem_arena = False
+        mock_settings.ort_enable_mem_pattern = False
+
+        options = build_session_options()
+
+        assert options.intra_op_num_threads == 2
+        assert options.inter_op_num_threads == 1
+        assert (
+            options.graph_optimization_level
+            == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        )
+        assert options.execution_mode == onnxruntime.ExecutionMode.ORT_PARALLEL
+        assert options.enable_cpu_mem_arena is False
+        assert options.enable_mem_pattern is False
+
+    def test_invalid_option(self, mock_settings):
+        """Test unknown option names fail model loading clearly"""
+        mock_settings.ort_graph_optimization = "max"
+
+        with pytest.raises(ModelLoadError, match="ort_graph_optimization"):
+            build_session_options()
+
+    def test_providers(self, mock_settings):
+        """Test configured provider order, filtering and the CPU override"""
+        assert session_providers() == onnxruntime.get_available_providers()
+
+        mock_settings.ort_providers = ["MissingExecutionProvider", "CPUExecutionProvider"]
+        assert session_providers() == ["CPUExecutionProvider"]
+
+        mock_settings.ort_providers = ["MissingExecutionProvider"]
+        with pytest.raises(ModelLoadError):
+            session_providers()
+
+        mock_settings.ctx_id = -1
+        assert session_providers() == ["CPUExecutionProvider"]
+
+    @patch("src.swaparoony.services.onnx_sessions.onnxruntime.InferenceSession")
+    def test_apply_session_config(self, mock_session, mock_settings):
+        """Test each model's session is recreated from its model file"""
+        mock_settings.ort_intra_op_threads = 3
+        models = [Mock(model_file="det.onnx"), Mock(model_file="swap.onnx")]
+
+        apply_session_config(models)
+
+        assert [call.args[0] for call in mock_session.call_args_list] == [
+            "det.onnx",
+            "swap.onnx",
+        ]
+        options = mock_session.call_args.kwargs["sess_options"]
+        assert options.intra_op_num_threads == 3
+        assert all(model.session is mock_session.return_value for model in models)
@@ -0,0 +1,70 @@
+import io
+import json
+import zipfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from insightface.model_zoo.inswapper import INSwapper
+
+from src.swaparoony.services.face_swap_service import FaceSwapService
+from src.swaparoony.services.profiling import (
+    profile_path,
+    profiling_allowed,
+    run_profiled,
+    zip_profile,
+)
+from tests.test_swap_ops import build_swapper_model, make_face
+
+
+class TestProfiling:
+    """Tests for on-demand request profiling"""
+
+    @pytest.fixture
+    def profile_settings(self, mock_settings, tmp_path):
+        mock_settings.profiling_token = "secret"
+        mock_settings.profile_dir = str(tmp_path / "profiles")
+        return mock_settings
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        service = FaceSwapService()
+        detector = SimpleNamespace(taskname="detection")
+        service.app = SimpleNamespace(det_model=detector, models={"detection": detector})
+        service.swapper = INSwapper(model_file=build_swapper_model(tmp_path / "m.onnx"))
+        service._initialized = True
+        return service
+
+    def test_token_gate(self, mock_settings):
+        """Test profiling needs a configured token and an exact match"""
+        assert not profiling_allowed("secret")
+        mock_settings.profiling_token = "secret"
+        assert profiling_allowed("secret")
+        assert not profiling_allowed("wrong")
+        assert not profiling_allowed(None)
+
+    def test_run_profiled(self, profile_settings, service):
+        """Test a profiled call stores cProfile stats and the swapper's ORT trace"""
+        source = make_face(embedding=np.ones(512, dtype=np.float32))
+        target = np.zeros((160, 160, 3), dtype=np.uint8)
+        shared_session = service.swapper.session
+
+        swapped, profile_id = run_profiled(
+            service, "_swap_batch", source, [(target, make_face())]
+        )
+
+        assert len(swapped) == 1
+        files = {path.name for path in profile_path(profile_id).iterdir()}
+        assert files == {"python.prof", "python.txt", "swapper_ort.json"}
+        trace = json.loads((profile_path(profile_id) / "swapper_ort.json").read_text())
+        assert any(event.get("cat") == "Node" for event in trace)
+        # The shared session is untouched
+        assert service.swapper.session is shared_session
+
+        archive = zipfile.ZipFile(io.BytesIO(zip_profile(profile_id)))
+        assert set(archive.namelist()) == files
+
+    def test_profile_path_rejects_other_names(self, profile_settings):
+        """Test only profile ids map to stored profiles"""
+        with pytest.raises(FileNotFoundError):
+            profile_path("../../etc")
@@ -0,0 +1,135 @@
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper, numpy_helper
+from insightface.app.common import Face
+from insightface.model_zoo.inswapper import INSwapper
+
+from src.swaparoony.services import swap_ops
+
+
+def build_swapper_model(path, batch_dim="N"):
+    """Write a tiny ONNX model with the inswapper_128 input/output layout"""
+    rng = np.random.default_rng(0)
+    weights = numpy_helper.from_array(
+        rng.normal(size=(512, 1)).astype(np.float32), "w"
+    )
+    shape = numpy_helper.from_array(np.array([-1, 1, 1, 1], dtype=np.int64), "shape")
+    # INSwapper reads the embedding map from the last initializer
+    emap = numpy_helper.from_array(
+        rng.normal(size=(512, 512)).astype(np.float32), "emap"
+    )
+    nodes = [
+        helper.make_node("MatMul", ["source", "w"], ["proj"]),
+        helper.make_node("Reshape", ["proj", "shape"], ["bias"]),
+        helper.make_node("Add", ["target", "bias"], ["shifted"]),
+        helper.make_node("Sigmoid", ["shifted"], ["output"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "tiny_inswapper",
+        [
+            helper.make_tensor_value_info(
+                "target", TensorProto.FLOAT, [batch_dim, 3, 128, 128]
+            ),
+            helper.make_tensor_value_info("source", TensorProto.FLOAT, [batch_dim, 512]),
+        ],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [batch_dim, 3, 128, 128])],
+        [weights, shape, emap],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def make_face(offset_x=0.0, scale=1.0, embedding=None):
+    kps = np.array(
+        [[38.3, 51.7], [73.5, 51.5], [56.0, 71.7], [41.5, 92.4], [70.7, 92.2]],
+        dtype=np.float32,
+    )
+    kps = kps * scale + np.array([offset_x, 20.0], dtype=np.float32)
+    return Face(bbox=np.array([0, 0, 1, 1]), kps=kps, embedding=embedding)
+
+
+class TestSwapOps:
+    """Tests for the batched inswapper helpers"""
+
+    @pytest.fixture(params=["N", 1], ids=["dynamic-batch", "fixed-batch"])
+    def swapper(self, request, tmp_path):
+        return INSwapper(model_file=build_swapper_model(tmp_path / "m.onnx", request.param))
+
+    @pytest.fixture
+    def source_face(self):
+        return make_face(
+            embedding=np.random.default_rng(1).normal(size=512).astype(np.float32)
+        )
+
+    def test_supports_batching(self, swapper):
+        """Test batch support follows the model's declared batch dimension"""
+        assert swap_ops.supports_batching(swapper) == (swapper.input_shape[0] != 1)
+
+    def test_batched_swap_matches_single_get(self, swapper, source_face):
+        """Test one batched run produces the same images as INSwapper.get"""
+        rng = np.random.default_rng(2)
+        targets = [
+            (rng.integers(0, 255, (240, 320, 3), dtype=np.uint8), make_face(40, 1.2)),
+            (rng.integers(0, 255, (300, 200, 3), dtype=np.uint8), make_face(10, 1.5)),
+        ]
+
+        latent = swap_ops.source_latent(swapper, source_face)
+        aligned = [swap_ops.align_target(swapper, img, face) for img, face in targets]
+        fakes = swap_ops.swap_aligned(swapper, aligned, latent)
+        batched = [swap_ops.paste_back(t, fake) for t, fake in zip(aligned, fakes)]
+
+        for (image, face), result in zip(targets, batched):
+            expected = swapper.get(image, face, source_face, paste_back=True)
+            assert result.shape == expected.shape
+            assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+
+    @pytest.mark.parametrize(
+        "scale,offset",
+        [
+            (1.0, (20.0, 0.0)),
+            (2.5, (150.0, 80.0)),
+            (3.0, (-60.0, -40.0)),
+            (2.0, (520.0, 380.0)),
+        ],
+        ids=["small", "large", "clipped-top-left", "clipped-bottom-right"],
+    )
+    def test_paste_back_roi_matches_full_frame(
+        self, swapper, source_face, scale, offset
+    ):
+        """Test ROI paste-back matches the full-frame blend on a copy"""
+        rng = np.random.default_rng(3)
+        image = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        face = make_face(offset[0], scale)
+        face.kps[:, 1] += offset[1]
+        aligned = swap_ops.align_target(swapper, image, face)
+        (fake,) = swap_ops.swap_aligned(
+            swapper, [aligned], swap_ops.source_latent(swapper, source_face)
+        )
+
+        expected = swap_ops.paste_back(aligned, fake)
+        result = swap_ops.paste_back_roi(aligned, fake)
+
+        assert result.shape == expected.shape
+        assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+        assert not np.shares_memory(result, image)
+
+    def test_swap_aligned_runs_session_once(self, swapper, source_face, mocker):
+        """Test a batch-capable model is run once for all targets"""
+        image = np.zeros((200, 200, 3), dtype=np.uint8)
+        aligned = [swap_ops.align_target(swapper, image, make_face()) for _ in range(3)]
+        run = mocker.spy(swapper.session, "run")
+
+        fakes = swap_ops.swap_aligned(
+            swapper, aligned, swap_ops.source_latent(swapper, source_face)
+        )
+
+        assert len(fakes) == 3
+        assert run.call_count == (1 if swap_ops.supports_batching(swapper) else 3)
+
+    def test_swap_aligned_empty(self, swapper):
+        """Test no targets means no inference"""
+        assert swap_ops.swap_aligned(swapper, [], np.zeros((1, 512))) == []
@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.swaparoony.services.face_swap_service import FaceSwapService
+from src.swaparoony.utils.timing import (
+    StageRecorder,
+    add_stage_observer,
+    remove_stage_observer,
+    stage,
+)
+
+BENCHMARK = Path(__file__).parents[1] / "scripts" / "benchmark-pipeline.py"
+
+
+class TestStageTiming:
+    """Tests for pipeline stage timing hooks"""
+
+    def test_observers_receive_stages(self):
+        """Test observers get each stage name and duration, errors included"""
+        seen = []
+        observer = lambda name, seconds: seen.append((name, seconds))
+        add_stage_observer(observer)
+        try:
+            with stage("decode"):
+                pass
+            with pytest.raises(ValueError):
+                with stage("detection"):
+                    raise ValueError("boom")
+        finally:
+            remove_stage_observer(observer)
+        with stage("ignored"):
+            pass
+
+        assert [name for name, _ in seen] == ["decode", "detection"]
+        assert all(seconds >= 0 for _, seconds in seen)
+
+    def test_recorder_collects_service_stages(self):
+        """Test the service reports its decode stage to an attached recorder"""
+        import cv2
+
+        service = FaceSwapService()
+        data = cv2.imencode(".png", np.zeros((8, 8, 3), dtype=np.uint8))[1].tobytes()
+
+        with StageRecorder() as recorder:
+            service._decode_image(data)
+            service._decode_image(data)
+        service._decode_image(data)
+
+        assert len(recorder.durations["decode"]) == 2
+        assert recorder.totals()["decode"] >= 0
+
+    def test_benchmark_stub_mode(self, tmp_path):
+        """Test the benchmark suite runs end to end without model weights"""
+        output = tmp_path / "benchmark.json"
+        subprocess.run(
+            [
+                sys.executable,
+                str(BENCHMARK),
+                "--stub",
+                "--runs=1",
+                "--warmup=0",
+                "--image-sizes=320",
+                "--face-counts=2",
+                "--gallery-sizes=2",
+                f"--json={output}",
+            ],
+            check=True,
+            capture_output=True,
+            cwd=tmp_path,
+        )
+
+        report = json.loads(output.read_text())
+        assert report["mode"] == "stub"
+        (case,) = report["cases"]
+        assert (case["faces_detected"], case["gallery_size"]) == (2, 2)
+        assert {
+            "upload_read",
+            "decode",
+            "detection",
+            "recognition",
+            "swap_inference",
+            "paste_back",
+            "encode",
+            "base64",
+            "serialization",
+        } <= set(case["stages"])
+        assert case["stages"]["paste_back"]["calls_per_request"] == 2